@@ -0,0 +1,110 @@
+"""store_chunk_embeddings_as_float32
+
+Revision ID: b4e2c71d9a05
+Revises: d7ffa8f9c684
+Create Date: 2026-10-15 10:12:08.215337
+
+"""
+
+import json
+import logging
+import struct
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e2c71d9a05"
+down_revision: Union[str, Sequence[str], None] = "d7ffa8f9c684"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_TABLE = "document_chunks"
+
+
+def _embedding_column(conn) -> dict | None:
+    inspector = sa.inspect(conn)
+    if _TABLE not in inspector.get_table_names():
+        return None
+    return next((c for c in inspector.get_columns(_TABLE) if c["name"] == "embedding"), None)
+
+
+def _pack(vector: list[float]) -> bytes:
+    return struct.pack(f"<{len(vector)}f", *vector)
+
+
+def _unpack(blob: bytes) -> list[float]:
+    return list(struct.unpack(f"<{len(blob) // 4}f", blob))
+
+
+def _rewrite_embeddings(conn, source: sa.Column, target: sa.Column, convert) -> None:
+    chunks = sa.table(_TABLE, sa.column("id", sa.Integer), source, target)
+    rows = conn.execute(sa.select(chunks.c.id, chunks.c[source.name])).all()
+    for chunk_id, value in rows:
+        conn.execute(
+            chunks.update().where(chunks.c.id == chunk_id).values({target.name: convert(value)})
+        )
+    logger.info(f"Rewrote {len(rows)} chunk embedding(s) into '{target.name}'")
+
+
+def upgrade() -> None:
+    """Replace the JSON embedding column with packed float32 bytes."""
+    conn = op.get_bind()
+    column = _embedding_column(conn)
+    if column is None or isinstance(column["type"], sa.LargeBinary):
+        logger.info("document_chunks.embedding is already binary or missing - nothing to do")
+        return
+
+    with op.batch_alter_table(_TABLE) as batch:
+        batch.add_column(sa.Column("embedding_f32", sa.LargeBinary(), nullable=True))
+
+    def to_blob(value) -> bytes:
+        if isinstance(value, str):
+            value = json.loads(value)
+        return _pack(value or [])
+
+    _rewrite_embeddings(
+        conn, sa.column("embedding", sa.JSON), sa.column("embedding_f32", sa.LargeBinary), to_blob
+    )
+
+    with op.batch_alter_table(_TABLE) as batch:
+        batch.drop_column("embedding")
+        batch.alter_column(
+            "embedding_f32",
+            new_column_name="embedding",
+            existing_type=sa.LargeBinary(),
+            nullable=False,
+        )
+
+
+def downgrade() -> None:
+    """Restore the JSON embedding column from the float32 bytes."""
+    conn = op.get_bind()
+    column = _embedding_column(conn)
+    if column is None or not isinstance(column["type"], sa.LargeBinary):
+        logger.info("document_chunks.embedding is not binary - nothing to do")
+        return
+
+    with op.batch_alter_table(_TABLE) as batch:
+        batch.add_column(sa.Column("embedding_json", sa.JSON(), nullable=True))
+
+    _rewrite_embeddings(
+        conn,
+        sa.column("embedding", sa.LargeBinary),
+        sa.column("embedding_json", sa.JSON),
+        lambda blob: _unpack(blob or b""),
+    )
+
+    with op.batch_alter_table(_TABLE) as batch:
+        batch.drop_column("embedding")
+        batch.alter_column(
+            "embedding_json",
+            new_column_name="embedding",
+            existing_type=sa.JSON(),
+            nullable=False,
+        )
@@ -0,0 +1,41 @@
+"""add_chunk_tenant_document_index
+
+Revision ID: c91f3a6e2b47
+Revises: b4e2c71d9a05
+Create Date: 2026-10-15 11:02:41.508913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c91f3a6e2b47"
+down_revision: Union[str, Sequence[str], None] = "b4e2c71d9a05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_INDEX = "ix_document_chunks_tenant_id_document_id"
+
+
+def _existing_indexes() -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    if "document_chunks" not in inspector.get_table_names():
+        return set()
+    return {index["name"] for index in inspector.get_indexes("document_chunks")}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _INDEX not in _existing_indexes():
+        op.create_index(_INDEX, "document_chunks", ["tenant_id", "document_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _INDEX in _existing_indexes():
+        op.drop_index(_INDEX, table_name="document_chunks")
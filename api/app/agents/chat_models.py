@@ -2,27 +2,57 @@
 
 from __future__ import annotations
 
+import hashlib
 import inspect
 from functools import lru_cache
 from typing import Any
+from urllib.parse import urlparse
 
 from app.core.config import Settings
 
+from .prompts import REACT_SYSTEM_PROMPT
 
-def _filter_init_kwargs(cls: type, kwargs: dict[str, Any]) -> dict[str, Any]:
+_PROMPT_CACHE_KEY = "agenthub-" + hashlib.sha256(REACT_SYSTEM_PROMPT.encode()).hexdigest()[:16]
+# Only OpenAI itself is known to accept `prompt_cache_key`; compatible servers may reject it.
+_OPENAI_HOST = "api.openai.com"
+
+
+@lru_cache(maxsize=16)
+def _allowed_init_kwargs(cls: type) -> frozenset[str] | None:
+    """Keyword names accepted by `cls.__init__`, or None when it takes any keyword."""
     try:
         sig = inspect.signature(cls.__init__)
     except Exception:
-        return kwargs
+        return None
 
     if any(p.kind == inspect.Parameter.VAR_KEYWORD for p in sig.parameters.values()):
-        return kwargs
+        return None
+
+    return frozenset(sig.parameters) - {"self"}
 
-    allowed = set(sig.parameters) - {"self"}
+
+def _filter_init_kwargs(cls: type, kwargs: dict[str, Any]) -> dict[str, Any]:
+    allowed = _allowed_init_kwargs(cls)
+    if allowed is None:
+        return kwargs
     return {k: v for k, v in kwargs.items() if k in allowed}
 
 
-@lru_cache(maxsize=8)
+@lru_cache(maxsize=1)
+def _load_chat_ollama() -> type:
+    from langchain_ollama import ChatOllama
+
+    return ChatOllama
+
+
+@lru_cache(maxsize=1)
+def _load_chat_openai() -> type:
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI
+
+
+@lru_cache(maxsize=32)
 def _cached_chat_model(
     provider: str,
     base_url: str,
@@ -30,12 +60,12 @@ def _cached_chat_model(
     api_key: str | None,
     timeout_seconds: float,
     max_retries: int,
+    keep_alive: str | None = None,
 ) -> Any:
     base = str(base_url).rstrip("/")
 
     if provider == "ollama":
-        from langchain_ollama import ChatOllama
-
+        ChatOllama = _load_chat_ollama()
         kwargs: dict[str, Any] = {
             "base_url": base,
             "model": model,
@@ -45,10 +75,12 @@ def _cached_chat_model(
             "timeout": timeout_seconds,
             "request_timeout": timeout_seconds,
         }
+        if keep_alive:
+            # Keeps the model (and its cached system-prompt prefix) resident between calls.
+            kwargs["keep_alive"] = keep_alive
         return ChatOllama(**_filter_init_kwargs(ChatOllama, kwargs))
 
-    from langchain_openai import ChatOpenAI
-
+    ChatOpenAI = _load_chat_openai()
     kwargs = {
         "base_url": f"{base}/v1",
         "api_key": api_key or "not-needed",
@@ -57,6 +89,10 @@ def _cached_chat_model(
         "timeout": timeout_seconds,
         "max_retries": max_retries,
     }
+    if provider == "openai" and urlparse(base).hostname == _OPENAI_HOST:
+        # Route requests sharing the agent system prompt to the same prompt-cache shard.
+        # Sent as raw request body so older openai SDKs without the parameter still work.
+        kwargs["extra_body"] = {"prompt_cache_key": _PROMPT_CACHE_KEY}
     return ChatOpenAI(**_filter_init_kwargs(ChatOpenAI, kwargs))
 
 
@@ -74,4 +110,27 @@ def create_chat_model(settings: Settings) -> Any:
         settings.llm_api_key,
         timeout_seconds,
         max_retries,
+        settings.llm_keep_alive,
     )
+
+
+def setup_llm_caching(settings: Settings) -> None:
+    """Install LangChain's global LLM cache when `llm_cache_enabled` is set.
+
+    Chat models are created with `temperature=0`, so replaying a cached generation for an
+    identical prompt is equivalent to calling the model again.
+    """
+    if not settings.llm_cache_enabled:
+        return
+
+    from langchain_core.globals import set_llm_cache
+
+    if settings.llm_cache_path:
+        from langchain_community.cache import SQLiteCache
+
+        set_llm_cache(SQLiteCache(database_path=settings.llm_cache_path))
+        return
+
+    from langchain_core.caches import InMemoryCache
+
+    set_llm_cache(InMemoryCache())
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import re
-from typing import Annotated, Any, AsyncIterator, Awaitable, Callable, Literal, Sequence, TypedDict
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Annotated, Any, AsyncIterator, Literal, NamedTuple, Sequence, TypedDict
 
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
@@ -14,74 +17,123 @@ from app.security import sanitize_user_input
 
 from .chat_models import create_chat_model
 from .prompts import REACT_SYSTEM_PROMPT
-from .tools import BASE_TOOLS, calculator_tool, create_document_lookup_tool
+from .response_cache import ResponseCache
+from .tools import BASE_TOOLS, create_document_lookup_tool
+from .tools.document_lookup import GET_DOCUMENT_FN_KEY, GetDocumentFn
+from .tools.calculator import reduce_numbers
 from .tools.search import SearchToolError, SearchToolNoResults, search_web
 
 logger = get_logger(__name__)
 
-GetDocumentFn = Callable[[str, str], Awaitable[dict[str, Any] | None]]
 NO_RESPONSE = "No response."
+LLM_NOT_CONFIGURED = "LLM not configured. Set LLM_PROVIDER and LLM_BASE_URL."
+
+# Search text handed to the summarizer; keeps prompts well inside num_ctx=2048 tokens.
+_MAX_SUMMARY_SOURCE_CHARS = 2000
+_SEARCH_QUESTION_RE = re.compile(r"(?:what|who|when|where|which|why|how)\b", re.IGNORECASE)
+_JSON_OBJECT_START_RE = re.compile(r"\s*\{")
+_MALFORMED_SCAN_CHARS = 256
+_NUMBER_RE = re.compile(r"-?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?")
+_MAX_MATH_CANDIDATE_CHARS = 200
+
+# Streamed tokens are coalesced until this many chars are buffered or the model pauses.
+_STREAM_FLUSH_CHARS = 64
+_STREAM_FLUSH_SECONDS = 0.01
+_STREAM_QUEUE_SIZE = 256
+_STREAM_DONE = object()
+
+_GRAPH_CACHE_SIZE = 128
+# tenant_id -> (chat model the graph was built with, compiled graph)
+_graph_cache: OrderedDict[str, tuple[Any, Any]] = OrderedDict()
 
 
 def _math_label(intent: str) -> str:
     return {"average": "average", "sum": "sum", "product": "product"}.get(intent, "result")
 
 
-def _math_answer(intent: str, result: str) -> str:
-    if result.startswith("Error:"):
-        return result
+def _math_answer(intent: str, result: float | int) -> str:
     return f"The {_math_label(intent)} is {result}."
 
 
-def _try_math_shortcut(message: str) -> dict[str, Any] | None:
-    translated = _translate_math_intent(message)
-    if not translated:
-        return None
+def _is_pure_math_candidate(message: str) -> bool:
+    """Cheap sniff for short numeric questions; URLs and code fences go through validation."""
+    return (
+        len(message) < _MAX_MATH_CANDIDATE_CHARS
+        and "://" not in message
+        and "`" not in message
+        and _NUMBER_RE.search(message) is not None
+    )
 
-    expr, intent = translated
+
+def _try_math_shortcut(message: str) -> dict[str, Any] | None:
     try:
-        result = calculator_tool.invoke({"expression": expr})
-        return {"answer": _math_answer(intent, result), "tools_used": ["calculator_tool"]}
+        translated = _translate_math_intent(message)
+    except ValueError as e:
+        answer = f"Error: Unsupported operation - {e}"
+        return {"answer": answer, "tools_used": ["calculator_tool"]}
     except Exception as e:
-        logger.warning(
-            "react_agent.math_intent_failed", error=str(e), expression=expr, intent=intent
-        )
+        logger.warning("react_agent.math_intent_failed", error=str(e))
+        return None
+    if not translated:
         return None
 
+    result, intent = translated
+    return {"answer": _math_answer(intent, result), "tools_used": ["calculator_tool"]}
 
-def _translate_math_intent(message: str) -> tuple[str, str] | None:
-    msg_lower = message.lower().strip()
-    numbers = re.findall(r"-?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?", message)
-    nums = [float(n.replace(",", "")) for n in numbers]
 
-    if len(nums) < 1:
-        return None
+# (intent, trigger keywords), checked in priority order.
+_MATH_INTENTS = (
+    ("average", ("average", "mean")),
+    ("sum", ("sum of", "add up")),
+    ("product", ("product", "multiply")),
+)
 
-    if "average" in msg_lower or "mean" in msg_lower:
-        expr = (
-            "(" + "+".join(str(int(n) if n == int(n) else n) for n in nums) + ")/" + str(len(nums))
-        )
-        return (expr, "average")
-    if "sum of" in msg_lower or "add up" in msg_lower:
-        expr = "+".join(str(int(n) if n == int(n) else n) for n in nums)
-        return (expr, "sum")
-    if "product" in msg_lower or "multiply" in msg_lower:
-        expr = "*".join(str(int(n) if n == int(n) else n) for n in nums)
-        return (expr, "product")
 
+def _math_intent(msg_lower: str) -> str | None:
+    for intent, keywords in _MATH_INTENTS:
+        if any(k in msg_lower for k in keywords):
+            return intent
     return None
 
 
+def _parse_number(text: str) -> float | int:
+    text = text.replace(",", "")
+    if "." not in text:
+        return int(text)
+    n = float(text)
+    return int(n) if n.is_integer() else n
+
+
+@lru_cache(maxsize=1024)
+def _translate_math_intent(message: str) -> tuple[float | int, str] | None:
+    """Resolve an average/sum/product question to `(result, intent)`, or None if it is not one.
+
+    Raises ValueError when the result is outside the calculator's limits.
+    """
+    # Keyword test first: most messages are not math, so skip the number scan for them.
+    intent = _math_intent(message.lower())
+    if intent is None:
+        return None
+
+    nums = tuple(_parse_number(n) for n in _NUMBER_RE.findall(message))
+    if not nums:
+        return None
+    return reduce_numbers(intent, nums), intent
+
+
 def _is_malformed(text: str) -> bool:
+    # Match the opening brace in place rather than strip() a copy of a long answer.
     if not isinstance(text, str):
         return False
-    t = text.strip()
-    if not t:
+    start = _JSON_OBJECT_START_RE.match(text)
+    if not start:
         return False
-    if t.startswith("{") and '"parameters"' in t and '"name"' in t:
+    # Leaked tool calls carry their keys up front; only scan the head of the object.
+    head = text[start.end() - 1 : start.end() - 1 + _MALFORMED_SCAN_CHARS]
+    if '"parameters"' in head and '"name"' in head:
         return True
     # Common tool-call-ish payloads from various providers
-    return t.startswith("{") and ('"tool_calls"' in t or '"function"' in t)
+    return '"tool_calls"' in head or '"function"' in head
 
 
 _STOP_WORDS = frozenset(
@@ -90,57 +142,96 @@ _STOP_WORDS = frozenset(
     "i me my you your we our it its".split()
 )
 
+# Leading question phrasing dropped from web-search queries.
+_QUESTION_PREFIX_RE = re.compile(
+    r"(?:what (?:is|are)(?: the)?|who (?:is|are)(?: the)?|how (?:is|are) the|how (?:does|do)"
+    r"|tell me about|explain|describe) ",
+    re.IGNORECASE,
+)
+# Whole whitespace-delimited stop words, so "it's" or "best-selling" stay intact.
+_STOP_WORD_RE = re.compile(
+    r"(?<!\S)(?:" + "|".join(sorted(_STOP_WORDS, key=len, reverse=True)) + r")(?!\S)",
+    re.IGNORECASE,
+)
+
 
+@lru_cache(maxsize=1024)
 def _search_query_from_message(message: str) -> str:
     q = message.strip().rstrip("?.").strip()
     if not q:
         return message
-    lower = q.lower()
-    for prefix in (
-        "what is the ",
-        "what is ",
-        "what are the ",
-        "what are ",
-        "who is the ",
-        "who are the ",
-        "who is ",
-        "who are ",
-        "how is the ",
-        "how are the ",
-        "how does ",
-        "how do ",
-        "tell me about ",
-        "explain ",
-        "describe ",
-    ):
-        if lower.startswith(prefix):
-            q = q[len(prefix) :].strip()
-            break
-    words = q.split()
-    kept = [w for w in words if w.lower() not in _STOP_WORDS]
-    q = " ".join(kept) if kept else q
+    prefix = _QUESTION_PREFIX_RE.match(q)
+    if prefix:
+        q = q[prefix.end() :].strip()
+    q = " ".join(_STOP_WORD_RE.sub("", q).split()) or q
     return q.strip() or message
 
 
+def _normalize_prompt(message: str) -> str:
+    """Cache key for a prompt: lowercased and whitespace-collapsed; no words are dropped."""
+    return " ".join(message.lower().split())
+
+
+_response_cache: ResponseCache | None = None
+
+
+def _get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        from app.core.config import get_settings
+
+        settings = get_settings()
+        _response_cache = ResponseCache(
+            maxsize=settings.agent_response_cache_size,
+            ttl_seconds=settings.agent_response_cache_ttl_seconds,
+        )
+    return _response_cache
+
+
+def reset_agent_graph_cache() -> None:
+    """Forget compiled graphs and the resolved chat model (call after reloading settings)."""
+    _graph_cache.clear()
+    _llm_configured.cache_clear()
+    _get_model_without_tools.cache_clear()
+
+
+def _clear_caches() -> None:
+    global _response_cache
+    _response_cache = None
+    reset_agent_graph_cache()
+
+
+_SYSTEM_MESSAGE = SystemMessage(content=REACT_SYSTEM_PROMPT)
+_SUMMARY_SYSTEM_MESSAGE = SystemMessage(
+    content=(
+        "You are a concise summarizer. Respond in English using plain text only. "
+        "Never output tool-call JSON or schemas."
+    )
+)
+_STRICT_SUMMARY_SYSTEM_MESSAGE = SystemMessage(
+    content=(
+        "You are a concise summarizer. Respond ONLY in English. "
+        "If the source text is not English, translate and summarize it in English. "
+        "Never output tool-call JSON or schemas."
+    )
+)
+_SUMMARY_PROMPT_TEMPLATE = (
+    "Summarize the following web search results in 2–4 concise sentences. "
+    "Answer the user's question directly.\n\n"
+    "Question: {message}\n\n"
+    "Search results:\n{search_content}"
+)
+
+
 class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], add_messages]
 
 
-def _create_agent_graph(tools: list) -> Any:
-    from app.core.config import get_settings
-
-    settings = get_settings()
-    model = create_chat_model(settings)
-    if not model:
-        return None
+def _create_agent_graph(model: Any, tools: list) -> Any:
     model_with_tools = model.bind_tools(tools)
 
     def call_model(state: AgentState, config: RunnableConfig) -> dict:
-        system = SystemMessage(content=REACT_SYSTEM_PROMPT)
-        response = model_with_tools.invoke(
-            [system] + list(state["messages"]),
-            config,
-        )
+        response = model_with_tools.invoke([_SYSTEM_MESSAGE, *state["messages"]], config)
         return {"messages": [response]}
 
     tool_node = ToolNode(tools)
@@ -152,7 +243,9 @@ def _create_agent_graph(tools: list) -> Any:
 
     def should_continue(state: AgentState) -> str:
         last = state["messages"][-1]
-        if isinstance(last, AIMessage) and last.tool_calls:
+        # Chat models hand graph nodes plain AIMessages (chunks are merged before the
+        # node returns), so an exact type check is enough here.
+        if type(last) is AIMessage and last.tool_calls:
             return "tools"
         return "end"
 
@@ -161,15 +254,15 @@ def _create_agent_graph(tools: list) -> Any:
     return workflow.compile()
 
 
-def agent_graph(
-    tenant_id: str,
-    get_document_fn: GetDocumentFn,
-) -> Any:
-    doc_tool = create_document_lookup_tool(tenant_id, get_document_fn)
-    tools = BASE_TOOLS + [doc_tool]
-    return _create_agent_graph(tools)
+@lru_cache(maxsize=1)
+def _llm_configured() -> bool:
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    return bool(settings.llm_base_url and settings.llm_provider)
 
 
+@lru_cache(maxsize=1)
 def _get_model_without_tools() -> Any:
     from app.core.config import get_settings
 
@@ -177,6 +270,34 @@ def _get_model_without_tools() -> Any:
     return create_chat_model(settings)
 
 
+def agent_graph(tenant_id: str) -> Any:
+    """Return the compiled graph for a tenant, building it only on first use.
+
+    The document fetcher is supplied per run via `_run_config`, so one graph per tenant
+    is reused until the underlying chat model changes.
+    """
+    model = _get_model_without_tools()
+    if not model:
+        return None
+
+    cached = _graph_cache.get(tenant_id)
+    if cached is not None and cached[0] is model:
+        _graph_cache.move_to_end(tenant_id)
+        return cached[1]
+
+    tools = BASE_TOOLS + [create_document_lookup_tool(tenant_id)]
+    graph = _create_agent_graph(model, tools)
+    _graph_cache[tenant_id] = (model, graph)
+    _graph_cache.move_to_end(tenant_id)
+    while len(_graph_cache) > _GRAPH_CACHE_SIZE:
+        _graph_cache.popitem(last=False)
+    return graph
+
+
+def _run_config(get_document_fn: GetDocumentFn) -> RunnableConfig:
+    return {"configurable": {GET_DOCUMENT_FN_KEY: get_document_fn}}
+
+
 async def _summarize_search_results(
     message: str,
     *,
@@ -187,27 +308,10 @@ async def _summarize_search_results(
     if not model:
         return None
 
-    if strict_english:
-        system = SystemMessage(
-            content=(
-                "You are a concise summarizer. Respond ONLY in English. "
-                "If the source text is not English, translate and summarize it in English. "
-                "Never output tool-call JSON or schemas."
-            )
-        )
-    else:
-        system = SystemMessage(
-            content=(
-                "You are a concise summarizer. Respond in English using plain text only. "
-                "Never output tool-call JSON or schemas."
-            )
-        )
+    system = _STRICT_SUMMARY_SYSTEM_MESSAGE if strict_english else _SUMMARY_SYSTEM_MESSAGE
 
-    prompt = (
-        "Summarize the following web search results in 2–4 concise sentences. "
-        "Answer the user's question directly.\n\n"
-        f"Question: {message}\n\n"
-        f"Search results:\n{search_content[:2000]}"
+    prompt = _SUMMARY_PROMPT_TEMPLATE.format_map(
+        {"message": message, "search_content": search_content}
     )
 
     try:
@@ -231,12 +335,13 @@ WebFallbackStatus = Literal["ok", "no_results", "search_failed", "summarize_fail
 async def _web_fallback_answer(message: str) -> tuple[str | None, WebFallbackStatus]:
     query = _search_query_from_message(message)
     try:
-        search_content = search_web(query)
+        search_content = await asyncio.to_thread(search_web, query)
     except SearchToolNoResults:
         return None, "no_results"
     except SearchToolError as e:
         logger.warning("react_agent.search_failed", error=str(e), query=query)
         return None, "search_failed"
+    search_content = search_content[:_MAX_SUMMARY_SOURCE_CHARS]
 
     summary = await _summarize_search_results(
         message,
@@ -257,27 +362,49 @@ async def _web_fallback_answer(message: str) -> tuple[str | None, WebFallbackSta
     return None, "summarize_failed"
 
 
-def _dedupe_tools(tools: list[str]) -> list[str]:
-    return list(dict.fromkeys(tools))
+def _looks_like_search_question(message: str) -> bool:
+    if _math_intent(message.lower()) is not None:
+        return False
+    return message.endswith("?") or _SEARCH_QUESTION_RE.match(message) is not None
+
+
+def _start_speculative_fallback(
+    message: str,
+) -> asyncio.Task[tuple[str | None, WebFallbackStatus]] | None:
+    from app.core.config import get_settings
+
+    if not get_settings().agent_speculative_search:
+        return None
+    if not _looks_like_search_question(message):
+        return None
+    return asyncio.create_task(_web_fallback_answer(message))
+
+
+def _add_tool(tools: list[str], name: str) -> list[str]:
+    if name not in tools:
+        tools.append(name)
+    return tools
 
 
 def _extract_result(res: dict[str, Any]) -> tuple[str, list[str]]:
     messages = res.get("messages") or []
-    final: str | None = None
+    last_ai: AIMessage | None = None
     used: list[str] = []
-
-    for m in reversed(messages):
-        if isinstance(m, AIMessage):
-            content = m.content
-            final = content if isinstance(content, str) else str(content)
-            final = final.strip() or NO_RESPONSE
-            break
+    seen: set[str] = set()
 
     for m in messages:
         if isinstance(m, ToolMessage) and getattr(m, "name", None):
-            used.append(m.name)
+            if m.name not in seen:
+                seen.add(m.name)
+                used.append(m.name)
+        elif type(m) is AIMessage:
+            last_ai = m
 
-    return final or NO_RESPONSE, _dedupe_tools(used)
+    if last_ai is None:
+        return NO_RESPONSE, used
+    content = last_ai.content
+    final = content if isinstance(content, str) else str(content)
+    return final.strip() or NO_RESPONSE, used
 
 
 def _validation_error_payload(tenant_id: str, error: ValueError) -> dict[str, Any]:
@@ -316,70 +443,179 @@ def _fallback_message(status: WebFallbackStatus) -> str:
     )
 
 
+def _needs_fallback(answer: str) -> bool:
+    return _is_malformed(answer) or not answer or answer == NO_RESPONSE
+
+
 async def _apply_fallback_if_needed(
-    message: str, answer: str, tools_used: list[str]
+    message: str,
+    answer: str,
+    tools_used: list[str],
+    pending: asyncio.Task[tuple[str | None, WebFallbackStatus]] | None = None,
 ) -> tuple[str, list[str]]:
-    if not (_is_malformed(answer) or not answer or answer == NO_RESPONSE):
+    if not _needs_fallback(answer):
         return answer, tools_used
 
-    summary, status = await _web_fallback_answer(message)
+    summary, status = await (pending or _web_fallback_answer(message))
     if summary:
-        return summary, _dedupe_tools(tools_used + ["search_tool"])
+        return summary, _add_tool(tools_used, "search_tool")
 
     fallback = _fallback_message(status)
     if status == "summarize_failed":
-        return fallback, _dedupe_tools(tools_used + ["search_tool"])
+        return fallback, _add_tool(tools_used, "search_tool")
     return fallback, tools_used
 
 
 def _message_text(msg: Any) -> str | None:
-    if isinstance(msg, AIMessage) and msg.content:
-        return msg.content if isinstance(msg.content, str) else str(msg.content)
-    if isinstance(msg, dict):
+    # AIMessageChunk tokens take the first branch; tool output is never streamed.
+    if isinstance(msg, AIMessage):
+        content = msg.content
+    elif isinstance(msg, dict):
         content = msg.get("content")
-        if content:
-            return content if isinstance(content, str) else str(content)
-    return None
+    else:
+        return None
+    if not content:
+        return None
+    return content if isinstance(content, str) else str(content)
 
 
-async def _stream_graph_messages(graph: Any, inputs: dict[str, Any]) -> AsyncIterator[str]:
-    async for msg, _metadata in graph.astream(inputs, stream_mode="messages"):
+async def _stream_graph_messages(
+    graph: Any, inputs: dict[str, Any], config: RunnableConfig
+) -> AsyncIterator[str]:
+    async for msg, _metadata in graph.astream(inputs, config, stream_mode="messages"):
         text = _message_text(msg)
         if text:
             yield text
 
 
-async def run_agent(
-    tenant_id: str,
-    message: str,
-    get_document_fn: GetDocumentFn,
-) -> dict[str, Any]:
+async def _batch_tokens(tokens: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Coalesce token deltas into chunks of ~64 chars, flushing after a 10 ms lull.
+
+    A producer task drains `tokens` into a bounded queue so a slow client applies
+    backpressure without stalling the flush timer.
+    """
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=_STREAM_QUEUE_SIZE)
+
+    async def produce() -> None:
+        try:
+            async for text in tokens:
+                await queue.put(text)
+        except Exception as e:
+            await queue.put(e)
+            return
+        await queue.put(_STREAM_DONE)
+
+    producer = asyncio.create_task(produce())
+    buffer: list[str] = []
+    size = 0
+    try:
+        while True:
+            if buffer:
+                try:
+                    item = await asyncio.wait_for(queue.get(), _STREAM_FLUSH_SECONDS)
+                except asyncio.TimeoutError:
+                    yield "".join(buffer)
+                    buffer.clear()
+                    size = 0
+                    continue
+            else:
+                item = await queue.get()
+
+            if item is _STREAM_DONE or isinstance(item, Exception):
+                if buffer:
+                    yield "".join(buffer)
+                if isinstance(item, Exception):
+                    raise item
+                return
+
+            buffer.append(item)
+            size += len(item)
+            if size >= _STREAM_FLUSH_CHARS:
+                yield "".join(buffer)
+                buffer.clear()
+                size = 0
+    finally:
+        producer.cancel()
+
+
+class _PreparedInvocation(NamedTuple):
+    """Outcome of the shared request prep: either a final `payload` or a graph to run."""
+
+    message: str
+    payload: dict[str, Any] | None = None
+    graph: Any = None
+    inputs: dict[str, Any] | None = None
+
+
+def _prepare_invocation(tenant_id: str, message: str) -> _PreparedInvocation:
+    # Short math questions never reach the LLM, so answer them before the injection scan.
+    candidate = message.strip()
+    if _is_pure_math_candidate(candidate):
+        math_result = _try_math_shortcut(candidate)
+        if math_result:
+            return _PreparedInvocation(candidate, payload=math_result)
+
     try:
         message = _validate_message(tenant_id, message)
     except ValueError as e:
-        return _validation_error_payload(tenant_id, e)
+        return _PreparedInvocation(message, payload=_validation_error_payload(tenant_id, e))
 
-    math_result = _try_math_shortcut(message)
-    if math_result:
-        return math_result
+    if not _is_pure_math_candidate(message):
+        math_result = _try_math_shortcut(message)
+        if math_result:
+            return _PreparedInvocation(message, payload=math_result)
 
-    graph = agent_graph(tenant_id, get_document_fn)
+    graph = agent_graph(tenant_id) if _llm_configured() else None
     if not graph:
-        return {"answer": "LLM not configured.", "tools_used": [], "error": "llm_not_configured"}
+        return _PreparedInvocation(
+            message,
+            payload={"answer": LLM_NOT_CONFIGURED, "tools_used": [], "error": "llm_not_configured"},
+        )
 
     inputs = {"messages": [HumanMessage(content=message)]}
-    try:
-        result = await graph.ainvoke(inputs)
-    except Exception as e:
-        logger.exception("react_agent.graph_invoke_failed", tenant_id=tenant_id, error=str(e))
-        return {
-            "answer": "Something went wrong while generating a response. Please try again.",
-            "tools_used": [],
-            "error": "agent_failed",
-        }
-    answer, tools_used = _extract_result(result)
+    return _PreparedInvocation(message, graph=graph, inputs=inputs)
 
-    answer, tools_used = await _apply_fallback_if_needed(message, answer, tools_used)
+
+async def run_agent(
+    tenant_id: str,
+    message: str,
+    get_document_fn: GetDocumentFn,
+) -> dict[str, Any]:
+    prepared = _prepare_invocation(tenant_id, message)
+    if prepared.payload is not None:
+        return prepared.payload
+    message = prepared.message
+
+    cache = _get_response_cache()
+    cache_key = _normalize_prompt(message)
+    cached = cache.get(tenant_id, cache_key)
+    if cached:
+        answer, tools_used = cached
+        return {"answer": answer, "tools_used": tools_used}
+
+    # Question-shaped prompts can start the web fallback now; it is dropped on a clean answer.
+    speculative = _start_speculative_fallback(message)
+    try:
+        try:
+            result = await prepared.graph.ainvoke(prepared.inputs, _run_config(get_document_fn))
+        except Exception as e:
+            logger.exception("react_agent.graph_invoke_failed", tenant_id=tenant_id, error=str(e))
+            return {
+                "answer": "Something went wrong while generating a response. Please try again.",
+                "tools_used": [],
+                "error": "agent_failed",
+            }
+        answer, tools_used = _extract_result(result)
+
+        if _needs_fallback(answer):
+            answer, tools_used = await _apply_fallback_if_needed(
+                message, answer, tools_used, speculative
+            )
+        else:
+            cache.set(tenant_id, cache_key, answer, tools_used)
+    finally:
+        if speculative is not None and not speculative.done():
+            speculative.cancel()
 
     return {"answer": answer, "tools_used": tools_used}
 
@@ -389,30 +625,15 @@ async def run_agent_stream(
     message: str,
     get_document_fn: GetDocumentFn,
 ) -> AsyncIterator[str]:
-    try:
-        message = _validate_message(tenant_id, message)
-    except ValueError as e:
-        logger.warning(
-            "agent.input_validation_failed",
-            tenant_id=tenant_id,
-            error=str(e),
-        )
-        yield "Input validation failed. Please check your input and try again."
-        return
-
-    math_result = _try_math_shortcut(message)
-    if math_result:
-        yield str(math_result.get("answer", ""))
+    prepared = _prepare_invocation(tenant_id, message)
+    if prepared.payload is not None:
+        yield str(prepared.payload.get("answer", ""))
         return
 
-    graph = agent_graph(tenant_id, get_document_fn)
-    if not graph:
-        yield "LLM not configured. Set LLM_PROVIDER and LLM_BASE_URL."
-        return
-
-    inputs = {"messages": [HumanMessage(content=message)]}
     try:
-        async for text in _stream_graph_messages(graph, inputs):
+        async for text in _batch_tokens(
+            _stream_graph_messages(prepared.graph, prepared.inputs, _run_config(get_document_fn))
+        ):
             yield text
     except Exception as e:
         logger.exception("react_agent.graph_stream_failed", tenant_id=tenant_id, error=str(e))
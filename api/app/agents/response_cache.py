@@ -0,0 +1,66 @@
+"""Tenant-scoped in-process cache for ReAct agent answers."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+
+CacheEntry = tuple[str, list[str], float]
+
+
+class ResponseCache:
+    """LRU cache of `(answer, tools_used)` keyed by `(tenant_id, normalized_prompt)`.
+
+    Entries live in one bucket per tenant. Entries expire after `ttl_seconds`; a bucket
+    keeps at most `maxsize` entries and at most `max_tenants` buckets are kept, both evicted
+    least recently used first. A `maxsize` of 0 disables the cache. Methods never await,
+    so each call is atomic on the event loop without locking.
+    """
+
+    def __init__(
+        self, maxsize: int = 256, ttl_seconds: float = 300.0, max_tenants: int = 128
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.max_tenants = max_tenants
+        self._buckets: OrderedDict[str, OrderedDict[str, CacheEntry]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def _bucket(self, tenant_id: str) -> OrderedDict[str, CacheEntry]:
+        bucket = self._buckets.get(tenant_id)
+        if bucket is not None:
+            self._buckets.move_to_end(tenant_id)
+            return bucket
+
+        bucket = self._buckets[tenant_id] = OrderedDict()
+        while len(self._buckets) > self.max_tenants:
+            self._buckets.popitem(last=False)
+        return bucket
+
+    def get(self, tenant_id: str, prompt_key: str) -> tuple[str, list[str]] | None:
+        if self.maxsize <= 0 or tenant_id not in self._buckets:
+            return None
+        bucket = self._bucket(tenant_id)
+        entry = bucket.get(prompt_key)
+        if entry is None:
+            return None
+        answer, tools_used, expires_at = entry
+        if expires_at <= time.monotonic():
+            del bucket[prompt_key]
+            return None
+        bucket.move_to_end(prompt_key)
+        return answer, list(tools_used)
+
+    def set(self, tenant_id: str, prompt_key: str, answer: str, tools_used: list[str]) -> None:
+        if self.maxsize <= 0:
+            return
+        bucket = self._bucket(tenant_id)
+        bucket[prompt_key] = (answer, list(tools_used), time.monotonic() + self.ttl_seconds)
+        bucket.move_to_end(prompt_key)
+        while len(bucket) > self.maxsize:
+            bucket.popitem(last=False)
+
+    def clear(self) -> None:
+        self._buckets.clear()
@@ -5,6 +5,9 @@ from __future__ import annotations
 import ast
 import math
 import operator
+import re
+from functools import lru_cache
+from typing import Sequence
 
 from langchain_core.tools import tool
 
@@ -26,6 +29,8 @@ _UNARY_OPS = {
 _MAX_EXPRESSION_LENGTH = 200
 _MAX_POWER_EXPONENT = 1000
 _MAX_INT_BITS = 4096  # Prevent extremely large integer allocations
+# Digits, arithmetic operators, parentheses and float/underscore literal syntax only.
+_ALLOWED_CHARS_RE = re.compile(r"[0-9\s+\-*/%().eE_]*", re.ASCII)
 
 
 def _ensure_real_number(value: object) -> float | int:
@@ -47,51 +52,80 @@ def _ensure_valid_result(result: object) -> float | int:
 def _check_pow_safety(left: float | int, right: float | int) -> None:
     if abs(right) > _MAX_POWER_EXPONENT:
         raise ValueError("Exponent too large")
-    if isinstance(left, int) and isinstance(right, int) and right >= 0 and abs(left) > 1:
-        estimated_bits = right * abs(left).bit_length()
-        if estimated_bits > _MAX_INT_BITS:
-            raise ValueError("Result too large")
+    if (
+        isinstance(left, int)
+        and isinstance(right, int)
+        and right > 0
+        and left not in (-1, 0, 1)
+        and right * left.bit_length() > _MAX_INT_BITS
+    ):
+        raise ValueError("Result too large")
 
 
-def _safe_eval(expr: str) -> float | int:
-    """Evaluate a simple math expression using a restricted AST."""
-    tree = ast.parse(expr, mode="eval")
-
-    def _eval_unary(node: ast.UnaryOp) -> float | int:
-        op = _UNARY_OPS.get(type(node.op))
-        if op is None:
+def _validate_node(node: ast.AST) -> None:
+    if isinstance(node, ast.Constant):
+        _ensure_real_number(node.value)
+    elif isinstance(node, ast.UnaryOp):
+        if type(node.op) not in _UNARY_OPS:
             raise ValueError(f"Unsupported unary operator: {type(node.op)}")
-        value = _eval_node(node.operand)
-        return _ensure_valid_result(op(value))
-
-    def _eval_binary(node: ast.BinOp) -> float | int:
-        left = _eval_node(node.left)
-        right = _eval_node(node.right)
-        op = _BIN_OPS.get(type(node.op))
-        if op is None:
+        _validate_node(node.operand)
+    elif isinstance(node, ast.BinOp):
+        if type(node.op) not in _BIN_OPS:
             raise ValueError(f"Unsupported operator: {type(node.op)}")
+        _validate_node(node.left)
+        _validate_node(node.right)
+    else:
+        raise ValueError(f"Unsupported expression: {type(node)}")
 
-        if isinstance(node.op, ast.Pow):
-            _check_pow_safety(left, right)
 
-        return _ensure_valid_result(op(left, right))
+@lru_cache(maxsize=512)
+def _compile_expression(expr: str) -> ast.expr:
+    """Parse and validate an expression once; repeated expressions reuse the checked tree."""
+    if not _ALLOWED_CHARS_RE.fullmatch(expr):
+        raise SyntaxError("only numbers and arithmetic operators are allowed")
+    tree = ast.parse(expr, mode="eval")
+    _validate_node(tree.body)
+    return tree.body
 
-    def _eval_node(node: ast.AST) -> float | int:
-        if isinstance(node, ast.Expression):
-            return _eval_node(node.body)
 
-        if isinstance(node, ast.Constant):
-            return _ensure_real_number(node.value)
+def _eval_node(node: ast.expr) -> float | int:
+    if isinstance(node, ast.Constant):
+        return node.value
 
-        if isinstance(node, ast.UnaryOp):
-            return _eval_unary(node)
+    if isinstance(node, ast.UnaryOp):
+        value = _eval_node(node.operand)
+        return _ensure_valid_result(_UNARY_OPS[type(node.op)](value))
 
-        if isinstance(node, ast.BinOp):
-            return _eval_binary(node)
+    left = _eval_node(node.left)
+    right = _eval_node(node.right)
+    if isinstance(node.op, ast.Pow):
+        _check_pow_safety(left, right)
+    return _ensure_valid_result(_BIN_OPS[type(node.op)](left, right))
 
-        raise ValueError(f"Unsupported expression: {type(node)}")
 
-    return _eval_node(tree)
+def _safe_eval(expr: str) -> float | int:
+    """Evaluate a simple math expression using a restricted AST."""
+    return _eval_node(_compile_expression(expr))
+
+
+def reduce_numbers(intent: str, values: Sequence[float | int]) -> float | int:
+    """Sum, average or multiply `values` directly instead of evaluating an expression.
+
+    Integer inputs stay exact; float inputs are summed with `math.fsum`. Results are held
+    to the same limits as `calculator_tool`.
+    """
+    if not values:
+        raise ValueError("No numbers to reduce")
+    if intent == "product":
+        return _ensure_valid_result(math.prod(values))
+
+    exact = all(isinstance(v, int) for v in values)
+    total = sum(values) if exact else math.fsum(values)
+    if intent == "sum":
+        return _ensure_valid_result(total)
+    if intent == "average":
+        return _ensure_valid_result(total / len(values))
+    raise ValueError(f"Unsupported reduction: {intent}")
 
 
 @tool
@@ -4,20 +4,33 @@ from __future__ import annotations
 
 from typing import Any, Awaitable, Callable
 
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 
+GetDocumentFn = Callable[[str, str], Awaitable[dict[str, Any] | None]]
+
+# RunnableConfig["configurable"] key holding the per-request document fetcher.
+GET_DOCUMENT_FN_KEY = "get_document_fn"
+
 
 def create_document_lookup_tool(
     tenant_id: str,
-    get_document_fn: Callable[[str, str], Awaitable[dict[str, Any] | None]],
+    get_document_fn: GetDocumentFn | None = None,
 ) -> Any:
-    """Create a document_lookup tool bound to tenant and async document fetcher."""
+    """Create a document_lookup tool bound to tenant and async document fetcher.
+
+    Without `get_document_fn`, the fetcher is read from the run config on each call
+    (`configurable[GET_DOCUMENT_FN_KEY]`), so the tool can outlive a single request.
+    """
 
     @tool
-    async def document_lookup_tool(document_id: str) -> str:
+    async def document_lookup_tool(document_id: str, config: RunnableConfig) -> str:
         """Look up a document by ID. Use when the user asks about a specific document or references a document ID."""
+        fetch = get_document_fn or (config.get("configurable") or {}).get(GET_DOCUMENT_FN_KEY)
+        if fetch is None:
+            return "Error fetching document: document store unavailable."
         try:
-            doc = await get_document_fn(document_id, tenant_id)
+            doc = await fetch(document_id, tenant_id)
             if not doc:
                 return f"Document '{document_id}' not found."
             return f"Title: {doc.get('title', 'Untitled')}\n\nContent:\n{doc.get('text', '')}"
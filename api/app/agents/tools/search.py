@@ -2,14 +2,37 @@
 
 from __future__ import annotations
 
-from contextlib import nullcontext
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 
 from langchain_core.tools import tool
 
+try:
+    from duckduckgo_search import DDGS
+except ImportError:  # pragma: no cover
+    DDGS = None
+
+try:
+    from langchain_tavily import TavilySearch
+except ImportError:  # pragma: no cover
+    TavilySearch = None
+
 _MAX_TITLE_CHARS = 160
 _MAX_SNIPPET_CHARS = 400
 _MAX_OUTPUT_CHARS = 6000
 _MAX_RESULTS_LIMIT = 10
+_SEARCH_TIMEOUT_SECONDS = 10
+_NEGATIVE_CACHE_SIZE = 512
+_NEGATIVE_CACHE_TTL_SECONDS = 60.0
+
+NegativeCacheKey = tuple[str, int, str, str]
+# (query, max_results, provider, region) -> (expires_at, query reported as empty)
+_negative_cache: OrderedDict[NegativeCacheKey, tuple[float, str]] = OrderedDict()
+# search_web runs in worker threads (asyncio.to_thread), so guard the shared cache.
+_negative_cache_lock = threading.Lock()
 
 
 class SearchToolError(RuntimeError):
@@ -63,16 +86,38 @@ def _format_results(
     return out
 
 
+# One DuckDuckGo client per worker thread: DDGS wraps an HTTP client that is not safe to
+# share between the concurrent asyncio.to_thread searches.
+_ddgs_local = threading.local()
+
+
+def _ddgs_client() -> DDGS:
+    """This thread's DuckDuckGo client; keeps its HTTP session and cookies across searches."""
+    client = getattr(_ddgs_local, "client", None)
+    if client is None:
+        client = _ddgs_local.client = DDGS(timeout=_SEARCH_TIMEOUT_SECONDS)
+    return client
+
+
+def _clear_ddgs_clients() -> None:
+    """Drop every thread's client so the next search builds a new one (tests, reloads)."""
+    global _ddgs_local
+    _ddgs_local = threading.local()
+
+
+@lru_cache(maxsize=_MAX_RESULTS_LIMIT)
+def _tavily_client(max_results: int, api_key: str | None) -> TavilySearch:
+    """Tavily tool per result limit; `api_key` is only part of the key so a new one rebuilds."""
+    return TavilySearch(max_results=max_results, topic="general")
+
+
 def _search_duckduckgo(query: str, max_results: int = 5, region: str = "us-en") -> str:
     """Perform web search via DuckDuckGo (free, no API key)."""
+    if DDGS is None:
+        raise SearchToolError("duckduckgo_search is not installed")
     try:
-        from duckduckgo_search import DDGS
-
-        ddgs = DDGS()
-        ctx = ddgs if hasattr(ddgs, "__enter__") else nullcontext(ddgs)
-        with ctx as d:
-            raw = d.text(query, region=region, max_results=max_results)
-            results = list(raw or [])
+        raw = _ddgs_client().text(query, region=region, max_results=max_results)
+        results = list(raw or [])
         return _format_results(
             query=query,
             results=results,
@@ -88,17 +133,15 @@ def _search_duckduckgo(query: str, max_results: int = 5, region: str = "us-en")
 
 def _search_tavily(query: str, max_results: int = 5) -> str:
     """Perform web search via Tavily (better quality, requires TAVILY_API_KEY)."""
-    import os
-
     from app.core.config import get_settings
 
+    if TavilySearch is None:
+        raise SearchToolError("langchain_tavily is not installed")
     settings = get_settings()
     if settings.tavily_api_key and not os.environ.get("TAVILY_API_KEY"):
         os.environ["TAVILY_API_KEY"] = settings.tavily_api_key
     try:
-        from langchain_tavily import TavilySearch
-
-        tool = TavilySearch(max_results=max_results, topic="general")
+        tool = _tavily_client(max_results, os.environ.get("TAVILY_API_KEY"))
         result = tool.invoke({"query": query})
         results = []
         if isinstance(result, dict):
@@ -116,8 +159,35 @@ def _search_tavily(query: str, max_results: int = 5) -> str:
         raise SearchToolError(str(e)) from e
 
 
+def _cached_no_results(key: NegativeCacheKey) -> SearchToolNoResults | None:
+    with _negative_cache_lock:
+        entry = _negative_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, detail = entry
+        if expires_at <= time.monotonic():
+            del _negative_cache[key]
+            return None
+        _negative_cache.move_to_end(key)
+    return SearchToolNoResults(detail)
+
+
+def _remember_no_results(key: NegativeCacheKey, error: SearchToolNoResults) -> None:
+    detail = error.args[0] if error.args else ""
+    with _negative_cache_lock:
+        _negative_cache[key] = (time.monotonic() + _NEGATIVE_CACHE_TTL_SECONDS, detail)
+        _negative_cache.move_to_end(key)
+        while len(_negative_cache) > _NEGATIVE_CACHE_SIZE:
+            _negative_cache.popitem(last=False)
+
+
 def search_web(query: str, max_results: int = 5) -> str:
-    """Search the web using the configured provider."""
+    """Search the web using the configured provider.
+
+    Empty searches are remembered for a minute, so retrying the same query fails fast
+    instead of repeating the round-trip. Provider errors may be transient and are never
+    remembered.
+    """
     from app.core.config import get_settings
 
     settings = get_settings()
@@ -126,9 +196,19 @@ def search_web(query: str, max_results: int = 5) -> str:
     except Exception:
         max_results = 5
     region = settings.search_region or "us-en"
-    if settings.search_provider == "tavily" and settings.tavily_api_key:
-        return _search_tavily(query, max_results)
-    return _search_duckduckgo(query, max_results, region=region)
+    use_tavily = settings.search_provider == "tavily" and bool(settings.tavily_api_key)
+
+    key = (query, max_results, "tavily" if use_tavily else "duckduckgo", region)
+    cached = _cached_no_results(key)
+    if cached is not None:
+        raise cached
+    try:
+        if use_tavily:
+            return _search_tavily(query, max_results)
+        return _search_duckduckgo(query, max_results, region=region)
+    except SearchToolNoResults as e:
+        _remember_no_results(key, e)
+        raise
 
 
 @tool
@@ -1,14 +1,17 @@
 """
-AI call audit retention: purge records older than AI_AUDIT_RETENTION_DAYS.
-Run via cron: python -m app.audit
+AI call audit writes and retention.
+
+Flows append rows to `audit_buffer`, which writes them in batches. Records older than
+AI_AUDIT_RETENTION_DAYS are purged via cron: python -m app.audit
 """
 
 from __future__ import annotations
 
 import asyncio
 from datetime import datetime, timedelta, timezone
+from typing import Any
 
-from sqlalchemy import delete
+from sqlalchemy import delete, insert, select
 
 from .core.config import get_settings
 from .core.logging import get_logger
@@ -17,6 +20,156 @@ from .models import AiCallAudit
 
 logger = get_logger(__name__)
 
+# Rows removed per DELETE; each batch is its own short transaction.
+PURGE_BATCH_SIZE = 5000
+
+# Buffered rows are written together once this many are queued, or after the interval.
+AUDIT_BUFFER_MAX = 500
+AUDIT_BUFFER_FLUSH_SECONDS = 0.05
+# Rows held while the database is unavailable; appends beyond this are refused.
+AUDIT_BUFFER_CAPACITY = 10_000
+# Writes attempted per row before it is dropped. With the backoff below the last attempt
+# lands roughly a minute after the first failure.
+AUDIT_WRITE_ATTEMPTS = 8
+# Delay before retrying after a failed write; doubles per consecutive failure up to the cap.
+AUDIT_RETRY_SECONDS = 0.5
+AUDIT_RETRY_MAX_SECONDS = 30.0
+# INSERTs in flight at once; further full batches wait in the queue.
+AUDIT_MAX_CONCURRENT_WRITES = 4
+
+# A queued row and the number of failed writes it has been through.
+_Entry = tuple[dict[str, Any], int]
+
+
+class AuditBuffer:
+    """Collects ai_call_audit rows in memory and writes them with one multi-row INSERT.
+
+    Each flush runs in its own short transaction, so a failed write never touches the
+    caller's session. Rows from a failed write go back to the front of the queue and are
+    retried with exponential backoff, up to `max_attempts` writes; no new write starts
+    while backing off, and at most `max_writes` run at once. `append` refuses rows once
+    `capacity` are queued. Rows still queued when the process dies are lost.
+    """
+
+    def __init__(
+        self,
+        max_rows: int = AUDIT_BUFFER_MAX,
+        flush_seconds: float = AUDIT_BUFFER_FLUSH_SECONDS,
+        capacity: int = AUDIT_BUFFER_CAPACITY,
+        max_attempts: int = AUDIT_WRITE_ATTEMPTS,
+        retry_seconds: float = AUDIT_RETRY_SECONDS,
+        max_retry_seconds: float = AUDIT_RETRY_MAX_SECONDS,
+        max_writes: int = AUDIT_MAX_CONCURRENT_WRITES,
+    ) -> None:
+        self.max_rows = max_rows
+        self.flush_seconds = flush_seconds
+        self.capacity = capacity
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.max_writes = max_writes
+        self._rows: list[_Entry] = []
+        self._timer: asyncio.Task | None = None
+        self._flushes: set[asyncio.Task] = set()
+        # Consecutive failed writes; non-zero means the buffer is backing off.
+        self._failures = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def append(self, row: dict[str, Any]) -> bool:
+        """Queue a row for the next write. False when the buffer is full and the row is refused."""
+        if len(self._rows) >= self.capacity:
+            logger.warning("audit.buffer_full", capacity=self.capacity)
+            return False
+        self._rows.append((row, 0))
+        if len(self._rows) >= self.max_rows and self._can_write():
+            self._cancel_timer()
+            self._spawn_write()
+        elif self._timer is None:
+            self._schedule(self.flush_seconds)
+        return True
+
+    async def flush(self) -> int:
+        """Write every queued row now. Returns the number of rows written."""
+        rows, self._rows = self._rows, []
+        return await self._write(rows)
+
+    async def _write(self, entries: list[_Entry]) -> int:
+        if not entries:
+            return 0
+        try:
+            async with get_engine().begin() as conn:
+                await conn.execute(insert(AiCallAudit), [row for row, _ in entries])
+        except Exception as exc:  # noqa: BLE001
+            self._failures += 1
+            retry = [
+                (row, attempts + 1) for row, attempts in entries if attempts + 1 < self.max_attempts
+            ]
+            logger.warning(
+                "audit.flush_failed",
+                rows=len(entries),
+                requeued=len(retry),
+                dropped=len(entries) - len(retry),
+                retry_in=self._retry_delay(),
+                error=str(exc),
+            )
+            if retry:
+                self._rows[:0] = retry
+                # Replaces any pending interval flush so nothing is written before the delay.
+                self._cancel_timer()
+                self._schedule(self._retry_delay())
+            return 0
+        self._failures = 0
+        return len(entries)
+
+    async def flush_and_wait(self) -> None:
+        """Drain the buffer and wait for in-flight writes (shutdown, tests).
+
+        Failed rows are retried after the same backoff until written or out of attempts.
+        """
+        self._cancel_timer()
+        if self._flushes:
+            await asyncio.gather(*self._flushes)
+        while self._rows:
+            if self._failures:
+                await asyncio.sleep(self._retry_delay())
+            await self.flush()
+            self._cancel_timer()
+
+    def _can_write(self) -> bool:
+        return not self._failures and len(self._flushes) < self.max_writes
+
+    def _retry_delay(self) -> float:
+        return min(self.retry_seconds * 2 ** (self._failures - 1), self.max_retry_seconds)
+
+    def _schedule(self, delay: float) -> None:
+        self._timer = asyncio.create_task(self._flush_later(delay))
+
+    async def _flush_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._timer = None
+        if len(self._flushes) >= self.max_writes:
+            # Every write slot is busy; look again after the interval.
+            self._schedule(self.flush_seconds)
+            return
+        self._spawn_write()
+
+    def _spawn_write(self) -> None:
+        # Tracked so flush_and_wait can await writes already in flight.
+        rows, self._rows = self._rows, []
+        task = asyncio.create_task(self._write(rows))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+audit_buffer = AuditBuffer()
+
 
 async def purge_expired_audits() -> int:
     """Delete ai_call_audit records older than ai_audit_retention_days. Returns count deleted."""
@@ -26,10 +179,19 @@ async def purge_expired_audits() -> int:
         logger.info("audit.purge_skipped", reason="retention_days_disabled")
         return 0
     cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    expired_ids = (
+        select(AiCallAudit.id).where(AiCallAudit.created_at < cutoff).limit(PURGE_BATCH_SIZE)
+    )
+    batch = delete(AiCallAudit).where(AiCallAudit.id.in_(expired_ids))
     engine = get_engine()
-    async with engine.begin() as conn:
-        result = await conn.execute(delete(AiCallAudit).where(AiCallAudit.created_at < cutoff))
-        deleted = result.rowcount
+    deleted = 0
+    while True:
+        async with engine.begin() as conn:
+            result = await conn.execute(batch)
+        deleted += result.rowcount
+        if result.rowcount < PURGE_BATCH_SIZE:
+            break
+        await asyncio.sleep(0)
     logger.info("audit.purge_complete", deleted=deleted, cutoff=cutoff.isoformat())
     return deleted
 
@@ -36,6 +36,7 @@ class Settings(BaseSettings):
     # Cache & Rate Limiting
     redis_url: Optional[str] = None
     rate_limit_per_minute: int = 120
+    redis_max_connections: int = 64
 
     # LLM Configuration
     llm_provider: Literal[
@@ -46,6 +47,17 @@ class Settings(BaseSettings):
     llm_model: str = "llama3.2"
     llm_timeout_seconds: float = 60.0
     llm_max_retries: int = 2
+    llm_keep_alive: Optional[str] = "10m"  # Ollama: keep model + prompt prefix cache loaded
+    # LangChain global LLM cache (identical prompts skip the model call; safe at temperature=0).
+    llm_cache_enabled: bool = False
+    llm_cache_path: Optional[str] = None  # SQLite file; in-memory when unset
+
+    # Agent Configuration
+    # In-process cache of agent answers: max entries per tenant (0 disables) and lifetime.
+    agent_response_cache_size: int = 256
+    agent_response_cache_ttl_seconds: float = 300.0
+    # Start the web-search fallback alongside the graph for question-shaped prompts.
+    agent_speculative_search: bool = False
 
     # Embedding Configuration
     embedding_provider: Literal["mock", "sentence-transformers", "openai"] = "mock"
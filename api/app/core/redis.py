@@ -1,17 +1,48 @@
 from __future__ import annotations
 
+import itertools
+import os
 import time
-import uuid
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from redis.asyncio import Redis
+from redis.exceptions import NoScriptError
 
 from .config import get_settings
 
 
 _redis: Redis | None = None
 
+# Sliding-window check in one atomic round-trip: trim, count, admit only when under the limit.
+# KEYS[1]=key; ARGV = now, window_start, member, limit, ttl. Returns 1 if admitted.
+_RATE_LIMIT_LUA = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, ARGV[2])
+local allowed = 0
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[4]) then
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[3])
+    allowed = 1
+end
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return allowed
+"""
+_rate_limit_sha: str | None = None
+
+# Sorted-set members only need to be unique: a random per-process prefix plus a counter.
+# The prefix (not the pid, which is often 1 in every container) keeps replicas apart and is
+# redrawn in forked workers.
+_rl_prefix = os.urandom(8).hex()
+_rl_counter = itertools.count()
+
+
+def _reset_rate_limit_member_prefix() -> None:
+    global _rl_prefix
+    _rl_prefix = os.urandom(8).hex()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_rate_limit_member_prefix)
+
 
 async def get_redis() -> Redis | None:
     global _redis
@@ -20,7 +51,15 @@ async def get_redis() -> Redis | None:
     if not url:
         return None
     if _redis is None:
-        _redis = Redis.from_url(str(url), decode_responses=True)
+        # Raw bytes: cached payloads are orjson output and are served without decoding.
+        _redis = Redis.from_url(
+            str(url),
+            decode_responses=False,
+            max_connections=getattr(settings, "redis_max_connections", 64),
+            health_check_interval=30,
+            socket_keepalive=True,
+            retry_on_timeout=True,
+        )
     return _redis
 
 
@@ -60,6 +99,18 @@ def cache_key(tenant_id: str, resource: str, resource_id: str) -> str:
     return f"cache:{tenant_id}:{resource}:{resource_id}"
 
 
+async def _run_rate_limit_script(client: Redis, key: str, *args: object) -> int:
+    global _rate_limit_sha
+    if _rate_limit_sha is None:
+        _rate_limit_sha = await client.script_load(_RATE_LIMIT_LUA)
+    try:
+        return await client.evalsha(_rate_limit_sha, 1, key, *args)
+    except NoScriptError:
+        # Server restarted or failed over and lost its script cache.
+        _rate_limit_sha = None
+        return await client.eval(_RATE_LIMIT_LUA, 1, key, *args)
+
+
 async def check_rate_limit(tenant_id: str, limit: int, window_seconds: int = 60) -> bool:
     client = await get_redis()
     if not client:
@@ -68,23 +119,16 @@ async def check_rate_limit(tenant_id: str, limit: int, window_seconds: int = 60)
     try:
         now = int(time.time())
         window_start = now - window_seconds
-        member = f"{now}:{uuid.uuid4().hex}"
-        pipe = client.pipeline()
-        pipe.zremrangebyscore(key, 0, window_start)
-        pipe.zadd(key, {member: now})
-        pipe.zcard(key)
-        pipe.expire(key, window_seconds + 1)
-        results = await pipe.execute()
-        count = results[2]
-        if count > limit:
-            await client.zrem(key, member)
-            return False
-        return True
+        member = f"{now}:{_rl_prefix}:{next(_rl_counter)}"
+        allowed = await _run_rate_limit_script(
+            client, key, now, window_start, member, limit, window_seconds + 1
+        )
+        return bool(allowed)
     except Exception:
         return True
 
 
-async def get_cached(key_prefix: str) -> str | None:
+async def get_cached(key_prefix: str) -> bytes | None:
     client = await get_redis()
     if not client:
         return None
@@ -94,7 +138,7 @@ async def get_cached(key_prefix: str) -> str | None:
         return None
 
 
-async def set_cached(key_prefix: str, value: str, ttl_seconds: int = 300) -> None:
+async def set_cached(key_prefix: str, value: bytes, ttl_seconds: int = 300) -> None:
     client = await get_redis()
     if not client:
         return
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
+import orjson
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -16,11 +17,22 @@ _engine: AsyncEngine | None = None
 _session_factory: async_sessionmaker[AsyncSession] | None = None
 
 
+def _json_dumps(value: Any) -> str:
+    # Matches stdlib json for int dict keys, which orjson otherwise rejects.
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 def get_engine() -> AsyncEngine:
     global _engine
     if _engine is None:
         settings = get_settings()
-        _engine = create_async_engine(settings.database_url, echo=False)
+        _engine = create_async_engine(
+            settings.database_url,
+            echo=False,
+            # JSON columns (audit payloads) round-trip through orjson instead of stdlib json.
+            json_serializer=_json_dumps,
+            json_deserializer=orjson.loads,
+        )
     return _engine
 
 
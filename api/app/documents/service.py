@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import codecs
+import re
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
 from fastapi import UploadFile
@@ -17,6 +20,7 @@ LEGACY_CREATED_AT = datetime(1970, 1, 1, tzinfo=timezone.utc)
 MAX_DOCUMENT_ID_LENGTH = 64
 MAX_DOCUMENT_TITLE_LENGTH = 255
 MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 64 * 1024
 
 
 class DocumentConflictError(Exception):
@@ -38,22 +42,19 @@ class PreparedUpload:
     text: str
 
 
+_NOT_DUPLICATE_RE = re.compile(r"foreign key|check constraint|not null|notnull", re.IGNORECASE)
+_DUPLICATE_RE = re.compile(
+    r"unique constraint|unique violation|duplicate key|duplicate entry|already exists",
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=256)
 def _message_indicates_duplicate(message: str) -> bool:
-    lowered = message.lower()
-    if any(
-        token in lowered for token in ("foreign key", "check constraint", "not null", "notnull")
-    ):
+    # Drivers repeat the same wording, so most classifications are cache hits.
+    if _NOT_DUPLICATE_RE.search(message):
         return False
-    return any(
-        token in lowered
-        for token in (
-            "unique constraint",
-            "unique violation",
-            "duplicate key",
-            "duplicate entry",
-            "already exists",
-        )
-    )
+    return _DUPLICATE_RE.search(message) is not None
 
 
 def _is_duplicate_key_error(exc: BaseException) -> bool:
@@ -76,7 +77,8 @@ def _is_duplicate_key_error(exc: BaseException) -> bool:
 def document_to_read(document: Document) -> DocumentRead:
     """Convert a persisted document into the API schema."""
     created_at = document.created_at if document.created_at is not None else LEGACY_CREATED_AT
-    return DocumentRead(
+    # Trusted ORM data with a fixed schema: skip re-validation.
+    return DocumentRead.model_construct(
         id=document.id,
         title=document.title,
         text=document.text,
@@ -117,10 +119,7 @@ async def create_document(
     title: str,
     text: str,
 ) -> Document:
-    existing = await fetch_document(db, tenant_id, document_id)
-    if existing is not None:
-        raise DocumentConflictError(document_id)
-
+    # No existence pre-check: the unique key rejects duplicates at commit, saving a round-trip.
     document = Document(
         id=document_id,
         tenant_id=tenant_id,
@@ -139,21 +138,31 @@ async def create_document(
     return document
 
 
+async def _read_upload_text(file: UploadFile) -> str:
+    """Decode the upload chunk by chunk, stopping as soon as it passes the size limit."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parts: list[str] = []
+    total = 0
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            total += len(chunk)
+            if total > MAX_UPLOAD_BYTES:
+                max_megabytes = MAX_UPLOAD_BYTES // 1024 // 1024
+                raise UploadTooLargeError(f"File too large (max {max_megabytes} MB)")
+            parts.append(decoder.decode(chunk))
+        parts.append(decoder.decode(b"", final=True))
+    except UnicodeDecodeError as exc:
+        raise UploadValidationError("File could not be decoded as UTF-8 text") from exc
+    return "".join(parts)
+
+
 async def prepare_uploaded_document(
     file: UploadFile,
     *,
     document_id: str | None = None,
     title: str | None = None,
 ) -> PreparedUpload:
-    body = await file.read()
-    if len(body) > MAX_UPLOAD_BYTES:
-        max_megabytes = MAX_UPLOAD_BYTES // 1024 // 1024
-        raise UploadTooLargeError(f"File too large (max {max_megabytes} MB)")
-
-    try:
-        text = body.decode("utf-8")
-    except UnicodeDecodeError as exc:
-        raise UploadValidationError("File could not be decoded as UTF-8 text") from exc
+    text = await _read_upload_text(file)
 
     resolved_document_id = document_id or (Path(file.filename or "upload").stem or "upload")
     resolved_title = title or (file.filename or "Uploaded document")
@@ -2,8 +2,6 @@ from __future__ import annotations
 
 from typing import AsyncIterator
 
-from sqlalchemy.ext.asyncio import AsyncSession
-
 from app.core.logging import get_logger
 from app.core.metrics import LLM_CALLS
 from app.llm.errors import LLMNotConfiguredError
@@ -33,7 +31,6 @@ def build_ask_prompt(question: str, context: str) -> str:
 async def run_ask_flow(
     *,
     tenant_id: str,
-    db: AsyncSession,
     payload: AskRequest,
     llm,
 ) -> AskResponse:
@@ -77,8 +74,7 @@ async def run_ask_flow(
             metadata={"fallback_reason": str(exc)},
         )
 
-    response.metadata["audit_persisted"] = await persist_audit_record(
-        db,
+    response.metadata["audit_persisted"] = persist_audit_record(
         tenant_id=tenant_id,
         flow_name="ask",
         request_payload=payload.model_dump(),
@@ -91,12 +87,9 @@ async def run_ask_flow(
 async def run_ask_flow_stream(
     *,
     tenant_id: str,
-    db: AsyncSession,
     payload: AskRequest,
     llm,
 ) -> AsyncIterator[str]:
-    del db
-
     if not llm.is_configured():
         raise AiFlowError(LLM_NOT_CONFIGURED_MESSAGE)
 
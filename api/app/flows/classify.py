@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-from sqlalchemy.ext.asyncio import AsyncSession
-
 from app.core.logging import get_logger
 from app.core.metrics import LLM_CALLS
 from app.llm.errors import LLMNotConfiguredError
@@ -21,7 +19,6 @@ logger = get_logger(__name__)
 async def run_classify_flow(
     *,
     tenant_id: str,
-    db: AsyncSession,
     payload: ClassifyRequest,
     llm,
 ) -> ClassifyResponse:
@@ -55,13 +52,12 @@ async def run_classify_flow(
             tenant_id=tenant_id,
         )
         raw = (result.raw_text or "").strip().lower()
-        first_word = raw.split()[0] if raw else "other"
-        labels_lower = [candidate.lower() for candidate in payload.candidate_labels]
-        if first_word in labels_lower:
-            matched_index = labels_lower.index(first_word)
-            label = payload.candidate_labels[matched_index]
-        else:
-            label = payload.candidate_labels[0]
+        first_word = raw.split(None, 1)[0] if raw else "other"
+        # Reversed so the first candidate wins when labels differ only by case.
+        labels_by_lower = {
+            candidate.lower(): candidate for candidate in reversed(payload.candidate_labels)
+        }
+        label = labels_by_lower.get(first_word, payload.candidate_labels[0])
         LLM_CALLS.labels(flow="classify", source="llm").inc()
         response = ClassifyResponse(
             label=label,
@@ -84,8 +80,7 @@ async def run_classify_flow(
             metadata={"fallback_reason": str(exc)},
         )
 
-    response.metadata["audit_persisted"] = await persist_audit_record(
-        db,
+    response.metadata["audit_persisted"] = persist_audit_record(
         tenant_id=tenant_id,
         flow_name="classify",
         request_payload=payload.model_dump(),
@@ -1,12 +1,11 @@
 from __future__ import annotations
 
 import uuid
+from datetime import datetime, timezone
 from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession
-
+from app.audit import audit_buffer
 from app.core.logging import get_logger
-from app.models import AiCallAudit
 from app.security import sanitize_user_input
 
 
@@ -40,8 +39,7 @@ def sanitize_flow_text(
         raise AiFlowError(f"Input validation failed: {exc}") from exc
 
 
-async def persist_audit_record(
-    db: AsyncSession,
+def persist_audit_record(
     *,
     tenant_id: str,
     flow_name: str,
@@ -49,22 +47,19 @@ async def persist_audit_record(
     response_payload: dict[str, Any],
     success: bool,
 ) -> bool:
-    audit = AiCallAudit(
-        id=str(uuid.uuid4()),
-        tenant_id=tenant_id,
-        flow_name=flow_name,
-        request_payload=request_payload,
-        response_payload=response_payload,
-        success=success,
+    """Queue the audit row for the next batched write; False when the buffer refused it.
+
+    Flows report the result as `metadata["audit_persisted"]`: True means the row was
+    queued, not yet committed (see `AuditBuffer`).
+    """
+    return audit_buffer.append(
+        {
+            "id": str(uuid.uuid4()),
+            "tenant_id": tenant_id,
+            "flow_name": flow_name,
+            "request_payload": request_payload,
+            "response_payload": response_payload,
+            "success": success,
+            "created_at": datetime.now(timezone.utc),
+        }
     )
-    try:
-        db.add(audit)
-        await db.commit()
-        return True
-    except Exception as exc:  # noqa: BLE001
-        logger.warning("ai_flow.audit_persist_failed", flow=flow_name, error=str(exc))
-        try:
-            await db.rollback()
-        except Exception as rollback_exc:  # noqa: BLE001
-            logger.warning("ai_flow.rollback_failed", flow=flow_name, error=str(rollback_exc))
-        return False
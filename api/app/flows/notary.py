@@ -87,8 +87,7 @@ async def run_notary_summarization_flow(
         source=source,
         metadata=metadata,
     )
-    response.metadata["audit_persisted"] = await persist_audit_record(
-        db,
+    response.metadata["audit_persisted"] = persist_audit_record(
         tenant_id=tenant_id,
         flow_name="notary_summarize",
         request_payload=payload.model_dump(),
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import APIRouter, FastAPI
 from fastapi.responses import ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
+from starlette.types import Scope
 
+from app.agents.chat_models import setup_llm_caching
+from app.audit import audit_buffer
 from app.core.config import get_settings
 from app.core.logging import configure_logging, get_logger
 from app.core.metrics import get_metrics, metrics_content_type
@@ -36,8 +40,10 @@ def _build_lifespan():
     @asynccontextmanager
     async def lifespan(_: FastAPI):
         await _init_db()
+        setup_llm_caching(get_settings())
         logger.info("app.startup")
         yield
+        await audit_buffer.flush_and_wait()
         await close_redis()
         logger.info("app.shutdown")
 
@@ -62,10 +68,32 @@ def _register_api_routes(app: FastAPI) -> None:
     app.include_router(api_router)
 
 
+class FrontendStaticFiles(StaticFiles):
+    """StaticFiles with cache headers for a Vite build.
+
+    Files under `assets/` carry a content hash in their name, so browsers may keep them
+    forever; everything else (index.html) is revalidated so new deploys are picked up.
+    """
+
+    def file_response(
+        self,
+        full_path: os.PathLike[str] | str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if self.get_path(scope).startswith("assets" + os.sep):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
+
+
 def _mount_static_frontend(app: FastAPI) -> None:
     static_dir = Path(__file__).resolve().parents[2] / "static"
     if static_dir.is_dir():
-        app.mount("/", StaticFiles(directory=str(static_dir), html=True), name="frontend")
+        app.mount("/", FrontendStaticFiles(directory=str(static_dir), html=True), name="frontend")
 
 
 def create_app() -> FastAPI:
@@ -2,11 +2,15 @@ from __future__ import annotations
 
 import time
 import uuid
+from typing import Any
 
 import structlog.contextvars
-from fastapi import FastAPI, Request, status
+from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import ORJSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import Settings
 from app.core.metrics import REQUEST_COUNT, REQUEST_LATENCY
@@ -14,31 +18,44 @@ from app.core.redis import check_rate_limit
 
 
 def install_http_middleware(app: FastAPI, settings: Settings) -> None:
-    _install_request_context_middleware(app)
+    # add_middleware wraps the current stack, so the last one added runs first.
+    # GZip sits innermost so only the final body is compressed.
+    app.add_middleware(GZipExceptStreamsMiddleware)
     _install_cors(app, settings)
-    _install_security_headers_middleware(app, settings)
+    app.add_middleware(HotPathMiddleware, settings=settings)
 
-    if settings.enable_prometheus:
-        _install_metrics_middleware(app)
 
-    if settings.redis_url and settings.api_v1_prefix:
-        _install_rate_limit_middleware(app, settings)
+# Label for requests no route matched (404s), so unknown URLs share one series.
+_UNMATCHED_PATH = "<unmatched>"
 
-    if settings.api_key:
-        _install_api_key_middleware(app, settings)
+_SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+}
+_HSTS_HEADER = ("Strict-Transport-Security", "max-age=31536000; includeSubDomains")
 
 
-def _install_request_context_middleware(app: FastAPI) -> None:
-    @app.middleware("http")
-    async def request_id_middleware(request: Request, call_next):
-        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
-        structlog.contextvars.bind_contextvars(request_id=request_id)
-        try:
-            response = await call_next(request)
-            response.headers["X-Request-ID"] = request_id
-            return response
-        finally:
-            structlog.contextvars.clear_contextvars()
+# Every SSE route ends in this segment (`/ai/ask/stream`, `/ai/rag/query/stream`, ...).
+_STREAM_PATH_SUFFIX = "/stream"
+
+
+class GZipExceptStreamsMiddleware:
+    """GZip for regular responses; SSE routes bypass it so each token is flushed at once.
+
+    Newer Starlette releases skip `text/event-stream` themselves, but older ones hold
+    streamed chunks in the compressor until its buffer fills.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=1024, compresslevel=5)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].endswith(_STREAM_PATH_SUFFIX):
+            await self.app(scope, receive, send)
+            return
+        await self.gzip(scope, receive, send)
 
 
 def _install_cors(app: FastAPI, settings: Settings) -> None:
@@ -56,64 +73,122 @@ def _install_cors(app: FastAPI, settings: Settings) -> None:
     )
 
 
-def _install_security_headers_middleware(app: FastAPI, settings: Settings) -> None:
-    @app.middleware("http")
-    async def security_headers_middleware(request: Request, call_next):
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        if settings.environment == "prod":
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        return response
-
-
-def _install_metrics_middleware(app: FastAPI) -> None:
-    @app.middleware("http")
-    async def metrics_middleware(request: Request, call_next):
-        started = time.perf_counter()
-        response = await call_next(request)
-        elapsed = time.perf_counter() - started
-        path = request.scope.get("path", "")
-        method = request.method
-        REQUEST_LATENCY.labels(method=method, path=path).observe(elapsed)
-        REQUEST_COUNT.labels(method=method, path=path, status=response.status_code).inc()
-        return response
-
-
-def _install_rate_limit_middleware(app: FastAPI, settings: Settings) -> None:
-    @app.middleware("http")
-    async def rate_limit_middleware(request: Request, call_next):
-        if not request.url.path.startswith(f"{settings.api_v1_prefix}/"):
-            return await call_next(request)
-
-        tenant_id = request.headers.get(settings.tenant_header_name) or settings.default_tenant_id
-        limit = getattr(settings, "rate_limit_per_minute", 120)
-        if not await check_rate_limit(tenant_id, limit=limit, window_seconds=60):
-            return ORJSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={"detail": "Rate limit exceeded. Try again later."},
+class _RouteMetrics:
+    """Request count/latency recorder with the `.labels()` children cached per route.
+
+    Series are labelled by the matched route template (`/api/v1/documents/{document_id}`)
+    or mount prefix rather than the raw URL, so ids and asset names never create new series.
+    """
+
+    def __init__(self) -> None:
+        self._latency: dict[tuple[str, str], Any] = {}
+        self._count: dict[tuple[str, str, int], Any] = {}
+
+    def record(self, scope: Scope, status_code: int, elapsed: float) -> None:
+        route = scope.get("route")
+        path = getattr(route, "path", None)
+        if not path:
+            # Mounts (the static frontend) set only endpoint/root_path, not a route.
+            path = (scope.get("root_path") or "/") if "endpoint" in scope else _UNMATCHED_PATH
+        method = scope["method"]
+
+        latency = self._latency.get((method, path))
+        if latency is None:
+            latency = self._latency[(method, path)] = REQUEST_LATENCY.labels(
+                method=method, path=path
+            )
+        count = self._count.get((method, path, status_code))
+        if count is None:
+            count = self._count[(method, path, status_code)] = REQUEST_COUNT.labels(
+                method=method, path=path, status=status_code
             )
-        return await call_next(request)
-
-
-def _install_api_key_middleware(app: FastAPI, settings: Settings) -> None:
-    exempt_paths = {f"{settings.api_v1_prefix}/health"}
-
-    @app.middleware("http")
-    async def api_key_middleware(request: Request, call_next):
-        if request.url.path in exempt_paths:
-            return await call_next(request)
-
-        require_auth = (
-            request.url.path.startswith(f"{settings.api_v1_prefix}/")
-            or request.url.path == "/metrics"
-        )
-        if require_auth:
-            key = request.headers.get("X-API-Key")
-            if key != settings.api_key:
-                return ORJSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"detail": "Invalid or missing API key"},
-                )
-        return await call_next(request)
+        latency.observe(elapsed)
+        count.inc()
+
+
+async def _reject_rate_limited(scope: Scope, receive: Receive, send: Send) -> None:
+    response = ORJSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Rate limit exceeded. Try again later."},
+    )
+    await response(scope, receive, send)
+
+
+async def _reject_unauthorized(scope: Scope, receive: Receive, send: Send) -> None:
+    response = ORJSONResponse(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        content={"detail": "Invalid or missing API key"},
+    )
+    await response(scope, receive, send)
+
+
+class HotPathMiddleware:
+    """Per-request work in one ASGI hop: API key, rate limit, metrics, security headers, request id.
+
+    401/429 short-circuit before anything else. Request headers are read in one pass, `send`
+    is wrapped once and the inner app is awaited once.
+    """
+
+    def __init__(self, app: ASGIApp, *, settings: Settings) -> None:
+        self.app = app
+        self.api_key = settings.api_key
+        self.api_prefix = f"{settings.api_v1_prefix}/"
+        self.exempt_paths = {f"{settings.api_v1_prefix}/health"}
+        self.rate_limited = bool(settings.redis_url and settings.api_v1_prefix)
+        self.tenant_header = settings.tenant_header_name.lower().encode("latin-1")
+        self.default_tenant_id = settings.default_tenant_id
+        self.limit = getattr(settings, "rate_limit_per_minute", 120)
+        self.metrics = _RouteMetrics() if settings.enable_prometheus else None
+        self.headers = dict(_SECURITY_HEADERS)
+        if settings.environment == "prod":
+            self.headers[_HSTS_HEADER[0]] = _HSTS_HEADER[1]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = tenant_id = api_key = None
+        for key, value in scope["headers"]:
+            # First value wins for repeated headers.
+            if key == b"x-request-id" and request_id is None:
+                request_id = value.decode("latin-1")
+            elif key == self.tenant_header and tenant_id is None:
+                tenant_id = value.decode("latin-1")
+            elif key == b"x-api-key" and api_key is None:
+                api_key = value.decode("latin-1")
+
+        path = scope["path"]
+        is_api = path.startswith(self.api_prefix)
+        if self.api_key:
+            require_auth = path not in self.exempt_paths and (is_api or path == "/metrics")
+            if require_auth and api_key != self.api_key:
+                await _reject_unauthorized(scope, receive, send)
+                return
+        if self.rate_limited and is_api:
+            tenant = tenant_id or self.default_tenant_id
+            if not await check_rate_limit(tenant, limit=self.limit, window_seconds=60):
+                await _reject_rate_limited(scope, receive, send)
+                return
+
+        request_id = request_id or uuid.uuid4().hex
+        structlog.contextvars.bind_contextvars(request_id=request_id)
+        status_code: int | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                for name, value in self.headers.items():
+                    headers[name] = value
+            await send(message)
+
+        started = time.perf_counter_ns()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            structlog.contextvars.clear_contextvars()
+        if self.metrics is not None and status_code is not None:
+            self.metrics.record(scope, status_code, (time.perf_counter_ns() - started) / 1e9)
@@ -1,7 +1,8 @@
-import orjson
+import time
+from collections import OrderedDict
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.context import ExecutionContext, clear_execution_context, set_execution_context
@@ -18,10 +19,69 @@ from app.schemas import DocumentCreate, DocumentRead
 from app.services.document_service import DocumentService
 
 
+_LOCAL_CACHE_TTL_SECONDS = 5.0
+_LOCAL_CACHE_SIZE = 1024
+# Bodies held per worker; large documents are left to Redis instead of pinned here.
+_LOCAL_CACHE_MAX_BYTES = 16 * 1024 * 1024
+_LOCAL_CACHE_MAX_ENTRY_BYTES = 64 * 1024
+# Per-worker tier in front of Redis for hot documents: cache key -> (expires_at, JSON payload).
+# Kept in insertion order, which with one TTL is also expiry order.
+_local_documents: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+_local_bytes = 0
+
+
 def _build_document_service(db: AsyncSession) -> DocumentService:
     return DocumentService(DocumentRepository(db))
 
 
+def _local_get(key: str) -> bytes | None:
+    entry = _local_documents.get(key)
+    if entry is None:
+        return None
+    expires_at, payload = entry
+    if expires_at <= time.monotonic():
+        _local_pop(key)
+        return None
+    return payload
+
+
+def _local_put(key: str, payload: bytes) -> None:
+    global _local_bytes
+    _local_pop(key)
+    if len(payload) > _LOCAL_CACHE_MAX_ENTRY_BYTES:
+        return
+    now = time.monotonic()
+    _local_documents[key] = (now + _LOCAL_CACHE_TTL_SECONDS, payload)
+    _local_bytes += len(payload)
+    # Oldest entries sit at the front: drop the expired ones, then trim to the budgets.
+    while _local_documents:
+        oldest, (expires_at, _) = next(iter(_local_documents.items()))
+        if (
+            expires_at > now
+            and len(_local_documents) <= _LOCAL_CACHE_SIZE
+            and _local_bytes <= _LOCAL_CACHE_MAX_BYTES
+        ):
+            break
+        _local_pop(oldest)
+
+
+def _local_pop(key: str) -> None:
+    global _local_bytes
+    entry = _local_documents.pop(key, None)
+    if entry is not None:
+        _local_bytes -= len(entry[1])
+
+
+def _local_clear() -> None:
+    global _local_bytes
+    _local_documents.clear()
+    _local_bytes = 0
+
+
+def _forget_local(tenant_id: str, document_id: str) -> None:
+    _local_pop(cache_key(tenant_id, "document", document_id))
+
+
 def build_documents_router(get_tenant_id) -> APIRouter:
     router = APIRouter(tags=["documents"])
 
@@ -35,12 +95,14 @@ def build_documents_router(get_tenant_id) -> APIRouter:
         set_execution_context(ctx)
         service = _build_document_service(db)
         try:
-            return await service.create(
+            document = await service.create(
                 document_id=payload.id,
                 title=payload.title,
                 text=payload.text,
                 context=ctx,
             )
+            _forget_local(tenant_id, document.id)
+            return document
         except ConflictError as exc:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -69,12 +131,14 @@ def build_documents_router(get_tenant_id) -> APIRouter:
                 document_id=document_id,
                 title=title,
             )
-            return await service.create(
+            document = await service.create(
                 document_id=prepared.document_id,
                 title=prepared.title,
                 text=prepared.text,
                 context=ctx,
             )
+            _forget_local(tenant_id, document.id)
+            return document
         except UploadTooLargeError as exc:
             raise HTTPException(
                 status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=str(exc)
@@ -92,31 +156,31 @@ def build_documents_router(get_tenant_id) -> APIRouter:
         finally:
             clear_execution_context()
 
-    @router.get("/documents/{document_id}")
+    @router.get("/documents/{document_id}", response_model=DocumentRead)
     async def get_document_route(
         document_id: str,
         tenant_id: Annotated[str, Depends(get_tenant_id)],
         db: Annotated[AsyncSession, Depends(get_db_session)],
-    ) -> DocumentRead:
+    ) -> Response:
+        # Serve JSON bytes directly: cached payloads were serialized once when stored.
         ctx = ExecutionContext.from_request(tenant_id=tenant_id)
         set_execution_context(ctx)
         try:
             service = _build_document_service(db)
-            cache_entry = await get_cached(cache_key(tenant_id, "document", document_id))
-            if cache_entry:
-                try:
-                    return DocumentRead.model_validate(orjson.loads(cache_entry))
-                except (TypeError, ValueError):
-                    pass
-
-            response = await service.read(document_id, context=ctx)
-
-            await set_cached(
-                cache_key(tenant_id, "document", document_id),
-                orjson.dumps(response.model_dump(mode="json")).decode(),
-                ttl_seconds=300,
-            )
-            return response
+            key = cache_key(tenant_id, "document", document_id)
+            payload = _local_get(key)
+            if payload is None:
+                payload = await get_cached(key)
+                if payload:
+                    _local_put(key, payload)
+            if payload:
+                return Response(content=payload, media_type="application/json")
+
+            document = await service.read(document_id, context=ctx)
+            payload = document.model_dump_json().encode()
+            _local_put(key, payload)
+            await set_cached(key, payload, ttl_seconds=300)
+            return Response(content=payload, media_type="application/json")
         except NotFoundError as exc:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
@@ -243,7 +243,6 @@ def _make_classify_handler(get_tenant_id):
             except Exception:
                 return await services_ai_flows.run_classify_flow(
                     tenant_id=tenant_id,
-                    db=db,
                     payload=payload,
                 )
 
@@ -306,7 +305,6 @@ def _make_ask_handler(get_tenant_id):
             except Exception:
                 return await services_ai_flows.run_ask_flow(
                     tenant_id=tenant_id,
-                    db=db,
                     payload=payload,
                 )
 
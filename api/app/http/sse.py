@@ -5,15 +5,19 @@ from typing import Any
 
 import orjson
 
+# Token events are framed around the orjson-encoded string, skipping a dict per token.
+_TOKEN_PREFIX = b'data: {"token":'
+_TOKEN_SUFFIX = b"}\n\n"
+
 
 def sse_event(payload: Mapping[str, Any]) -> bytes:
-    return f"data: {orjson.dumps(dict(payload)).decode()}\n\n".encode()
+    return b"data: " + orjson.dumps(dict(payload)) + b"\n\n"
 
 
 async def stream_text_tokens(source: AsyncIterable[str]) -> AsyncIterator[bytes]:
     try:
         async for chunk in source:
-            yield sse_event({"token": chunk})
+            yield _TOKEN_PREFIX + orjson.dumps(chunk) + _TOKEN_SUFFIX
     except Exception as exc:  # noqa: BLE001
         yield sse_event({"error": str(exc), "done": True})
         return
@@ -3,14 +3,37 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any
 
-from sqlalchemy import JSON, DateTime, Integer, String, Text
+import numpy as np
+from sqlalchemy import JSON, DateTime, Index, Integer, LargeBinary, String, Text
+from sqlalchemy.engine import Dialect
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.types import TypeDecorator
 
 
 class Base(DeclarativeBase):
     pass
 
 
+class Float32Vector(TypeDecorator):
+    """Vector stored as packed little-endian float32 bytes, read back as a NumPy array.
+
+    Accepts any float sequence on write; reads are a zero-copy `np.frombuffer` view.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> bytes | None:
+        if value is None:
+            return None
+        return np.asarray(value, dtype="<f4").tobytes()
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> np.ndarray | None:
+        if value is None:
+            return None
+        return np.frombuffer(value, dtype="<f4")
+
+
 class TenantScopedMixin:
     tenant_id: Mapped[str] = mapped_column(String(64), index=True)
 
@@ -19,14 +42,16 @@ class DocumentChunk(Base, TenantScopedMixin):
     """Chunk of a document with embedding for RAG retrieval."""
 
     __tablename__ = "document_chunks"
+    # Re-index deletes and document-filtered retrieval both filter on tenant + document.
+    __table_args__ = (
+        Index("ix_document_chunks_tenant_id_document_id", "tenant_id", "document_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     document_id: Mapped[str] = mapped_column(String(64), index=True)
     chunk_index: Mapped[int] = mapped_column(Integer)
     text: Mapped[str] = mapped_column(Text)
-    embedding: Mapped[list[float]] = mapped_column(
-        JSON
-    )  # Vector stored as JSON for SQLite compatibility
+    embedding: Mapped[np.ndarray] = mapped_column(Float32Vector)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
@@ -13,26 +13,25 @@ def chunk_text(
     if len(text) <= chunk_size:
         return [text]
 
+    # Work on offsets into `text` and slice once per chunk.
     chunks: list[str] = []
+    length = len(text)
     start = 0
-    while start < len(text):
-        end = min(start + chunk_size, len(text))
-        chunk = text[start:end]
-
-        if end < len(text) and chunk:
-            # Prefer to split at sentence boundary (period or newline)
-            last_period = chunk.rfind(".")
-            last_newline = chunk.rfind("\n")
-            split_at = max(last_period, last_newline)
-            if split_at >= 0 and split_at > chunk_size // 2:
-                chunk = text[start : start + split_at + 1]
-                start = start + split_at + 1 - chunk_overlap
-            else:
-                start = end - chunk_overlap
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            # Prefer to split at a sentence boundary (period or newline) past the midpoint.
+            lo = start + chunk_size // 2 + 1
+            split_at = max(text.rfind(".", lo, end), text.rfind("\n", lo, end))
+            if split_at >= 0:
+                end = split_at + 1
+            next_start = end - chunk_overlap
         else:
-            start = len(text)
+            next_start = length
 
-        if chunk.strip():
-            chunks.append(chunk.strip())
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        start = next_start
 
     return chunks
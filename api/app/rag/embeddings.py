@@ -1,22 +1,61 @@
 from __future__ import annotations
 
 import hashlib
-from typing import List
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
 
 from ..core.config import get_settings
 
+# Content-hash cache: re-indexing a document only embeds chunks whose text changed.
+# Vectors are kept as float32 arrays (1.5 MB at 1024 x 384 dims).
+_CACHE_SIZE = 1024
+
+# (provider, model, dimension, sha256 digest of the text)
+CacheKey = tuple[str, Optional[str], int, bytes]
+
 
 class EmbeddingService:
+    def __init__(self, cache_size: int = _CACHE_SIZE) -> None:
+        self.cache_size = cache_size
+        self._cache: OrderedDict[CacheKey, np.ndarray] = OrderedDict()
+
     async def embed(self, text: str) -> List[float]:
+        return self._embed_cached(text, self._model_key())
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed many texts in one call, in order; providers can batch the request."""
+        model_key = self._model_key()
+        return [self._embed_cached(text, model_key) for text in texts]
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    def _model_key(self) -> tuple[str, Optional[str], int]:
         settings = get_settings()
-        dim = settings.embedding_dimension
-        if settings.embedding_model == "mock":
-            return self._mock_embed(text, dim)
-        return self._mock_embed(text, dim)
-
-    def _mock_embed(self, text: str, dim: int) -> List[float]:
-        h = hashlib.sha256(text.encode()).digest()
-        return [float((h[i % len(h)] - 128) / 128.0) for i in range(dim)]
+        provider = getattr(settings, "embedding_provider", "mock")
+        return provider, settings.embedding_model, settings.embedding_dimension
+
+    def _embed_cached(self, text: str, model_key: tuple[str, Optional[str], int]) -> List[float]:
+        digest = hashlib.sha256(text.encode()).digest()
+        key = (*model_key, digest)
+        vector = self._cache.get(key)
+        if vector is not None:
+            self._cache.move_to_end(key)
+            return vector.tolist()
+
+        vector = self._mock_embed(digest, model_key[2])
+        if self.cache_size > 0:
+            self._cache[key] = vector
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return vector.tolist()
+
+    def _mock_embed(self, digest: bytes, dim: int) -> np.ndarray:
+        # Digest bytes repeated cyclically to `dim`, mapped to [-1, 1).
+        values = np.resize(np.frombuffer(digest, dtype=np.uint8), dim).astype(np.float32)
+        return (values - np.float32(128.0)) / np.float32(128.0)
 
 
 embedding_service = EmbeddingService()
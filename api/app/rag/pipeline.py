@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import asyncio
-import heapq
-import math
-from typing import Any
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Sequence
 
-from sqlalchemy import delete, select
+import numpy as np
+from sqlalchemy import delete, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_session_factory
@@ -13,19 +14,66 @@ from ..models import DocumentChunk
 from .chunking import chunk_text
 from .embeddings import embedding_service
 
+# Tenants whose chunk matrix is kept in memory between queries.
+_TENANT_CACHE_SIZE = 64
 
-def _cosine_similarity(a: list[float], b: list[float]) -> float:
-    if not a or not b or len(a) != len(b):
-        return 0.0
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(x * x for x in b))
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (norm_a * norm_b)
+
+def _embedding_matrix(embeddings: Sequence[Sequence[float]], dim: int) -> np.ndarray:
+    """Stack embeddings into an `(N, dim)` float32 matrix; rows of another length stay zero."""
+    matrix = np.zeros((len(embeddings), dim), dtype=np.float32)
+    for i, emb in enumerate(embeddings):
+        if len(emb) == dim:
+            matrix[i] = emb
+    return matrix
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length in place (zero rows stay zero), so cosine is a dot product."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def _top_k_rows(
+    query_vec: Sequence[float], unit_matrix: np.ndarray, top_k: int
+) -> list[tuple[int, float]]:
+    """`(row, score)` for the `top_k` rows most similar to `query_vec`, best first.
+
+    `unit_matrix` rows are already unit length, so scoring is one mat-vec product with the
+    normalized query; zero rows (and a zero or wrong-dimension query) score 0.0.
+    """
+    if top_k <= 0 or not len(unit_matrix):
+        return []
+    query = np.asarray(query_vec, dtype=np.float32)
+    scores = np.zeros(len(unit_matrix), dtype=np.float32)
+    query_norm = float(np.linalg.norm(query)) if query.size else 0.0
+    if query_norm and query.size == unit_matrix.shape[1]:
+        scores = unit_matrix @ (query / query_norm)
+
+    if top_k < len(scores):
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        candidates = np.arange(len(scores))
+    ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(int(i), float(scores[i])) for i in ranked]
+
+
+@dataclass
+class _TenantChunks:
+    """A tenant's chunks as parallel columns plus the unit-normalized embedding matrix."""
+
+    version: tuple[Any, ...]
+    document_ids: list[str]
+    chunk_indices: list[int]
+    texts: list[str]
+    unit_matrix: np.ndarray
 
 
 class RAGPipeline:
+    def __init__(self) -> None:
+        self._tenants: OrderedDict[str, _TenantChunks] = OrderedDict()
+
     async def index_document(
         self,
         *,
@@ -38,7 +86,7 @@ class RAGPipeline:
         if not chunks:
             return 0
 
-        embeddings = await asyncio.gather(*(embedding_service.embed(chunk) for chunk in chunks))
+        embeddings = await embedding_service.embed_batch(chunks)
 
         factory = get_session_factory()
 
@@ -49,16 +97,25 @@ class RAGPipeline:
                     DocumentChunk.tenant_id == tenant_id,
                 )
             )
-            for i, (chunk_text_val, emb) in enumerate(zip(chunks, embeddings)):
-                dc = DocumentChunk(
-                    tenant_id=tenant_id,
-                    document_id=document_id,
-                    chunk_index=i,
-                    text=chunk_text_val,
-                    embedding=emb,
-                )
-                session.add(dc)
+            # One timestamp for the whole document instead of a column default call per row.
+            created_at = datetime.now(timezone.utc)
+            # Core executemany: one INSERT for all chunks, no ORM instances to hydrate.
+            await session.execute(
+                insert(DocumentChunk),
+                [
+                    {
+                        "tenant_id": tenant_id,
+                        "document_id": document_id,
+                        "chunk_index": i,
+                        "text": chunk_text_val,
+                        "embedding": emb,
+                        "created_at": created_at,
+                    }
+                    for i, (chunk_text_val, emb) in enumerate(zip(chunks, embeddings))
+                ],
+            )
             await session.commit()
+            self._tenants.pop(tenant_id, None)
             return len(chunks)
 
         if db:
@@ -79,46 +136,85 @@ class RAGPipeline:
         factory = get_session_factory()
 
         async def _do(session: AsyncSession) -> list[dict[str, Any]]:
-            stmt = select(
-                DocumentChunk.document_id,
-                DocumentChunk.chunk_index,
-                DocumentChunk.text,
-                DocumentChunk.embedding,
-            ).where(DocumentChunk.tenant_id == tenant_id)
-            if document_ids:
-                stmt = stmt.where(DocumentChunk.document_id.in_(document_ids))
-            result = await session.execute(stmt)
-            rows = result.all()
-            if not rows:
+            tenant = await self._tenant_chunks(session, tenant_id, len(query_vec))
+            if tenant is None:
                 return []
 
-            top_matches: list[tuple[float, str, int, str]] = []
-            for document_id_value, chunk_index_value, text_value, embedding_value in rows:
-                score = _cosine_similarity(query_vec, embedding_value)
-                entry = (score, document_id_value, chunk_index_value, text_value)
-                if len(top_matches) < top_k:
-                    heapq.heappush(top_matches, entry)
-                    continue
-                if score > top_matches[0][0]:
-                    heapq.heapreplace(top_matches, entry)
-
-            top_matches.sort(reverse=True)
-            return [
-                {
-                    "text": text_value,
-                    "document_id": document_id_value,
-                    "chunk_index": chunk_index_value,
-                    "score": round(score, 4),
-                    "metadata": {"document_id": document_id_value},
-                }
-                for score, document_id_value, chunk_index_value, text_value in top_matches
-            ]
+            # Unfiltered queries score the cached matrix itself; only a filter copies rows.
+            matrix, rows = tenant.unit_matrix, None
+            if document_ids:
+                wanted = set(document_ids)
+                rows = np.flatnonzero([doc_id in wanted for doc_id in tenant.document_ids])
+                if not len(rows):
+                    return []
+                matrix = matrix[rows]
+            ranked = _top_k_rows(query_vec, matrix, top_k)
+
+            results = []
+            for i, score in ranked:
+                row = i if rows is None else int(rows[i])
+                document_id_value = tenant.document_ids[row]
+                results.append(
+                    {
+                        "text": tenant.texts[row],
+                        "document_id": document_id_value,
+                        "chunk_index": tenant.chunk_indices[row],
+                        "score": round(score, 4),
+                        "metadata": {"document_id": document_id_value},
+                    }
+                )
+            return results
 
         if db:
             return await _do(db)
         async with factory() as session:
             return await _do(session)
 
+    async def _tenant_chunks(
+        self, session: AsyncSession, tenant_id: str, dim: int
+    ) -> _TenantChunks | None:
+        """The tenant's chunks, from memory unless the table changed since they were loaded.
+
+        The version probe is one aggregate over the tenant index; re-indexing in any worker
+        changes it (new ids and timestamps), so other workers reload on their next query.
+        """
+        version_stmt = select(
+            func.count(DocumentChunk.id),
+            func.max(DocumentChunk.id),
+            func.max(DocumentChunk.created_at),
+        ).where(DocumentChunk.tenant_id == tenant_id)
+        version = (*(await session.execute(version_stmt)).one(), dim)
+        if not version[0]:
+            self._tenants.pop(tenant_id, None)
+            return None
+
+        cached = self._tenants.get(tenant_id)
+        if cached is not None and cached.version == version:
+            self._tenants.move_to_end(tenant_id)
+            return cached
+
+        stmt = select(
+            DocumentChunk.document_id,
+            DocumentChunk.chunk_index,
+            DocumentChunk.text,
+            DocumentChunk.embedding,
+        ).where(DocumentChunk.tenant_id == tenant_id)
+        rows = (await session.execute(stmt)).all()
+        tenant = _TenantChunks(
+            version=version,
+            document_ids=[row[0] for row in rows],
+            chunk_indices=[row[1] for row in rows],
+            texts=[row[2] for row in rows],
+            unit_matrix=_normalize_rows(_embedding_matrix([row[3] for row in rows], dim)),
+        )
+        self._tenants[tenant_id] = tenant
+        while len(self._tenants) > _TENANT_CACHE_SIZE:
+            self._tenants.popitem(last=False)
+        return tenant
+
+    def clear_cache(self) -> None:
+        self._tenants.clear()
+
     async def get_chunks(
         self,
         *,
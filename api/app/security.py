@@ -25,18 +25,21 @@ _INJECTION_PATTERNS = [
     r"###\s*system",
 ]
 
-_COMPILED_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in _INJECTION_PATTERNS]
+# One alternation scans the text once; the named group says which pattern fired.
+_COMBINED_PATTERN = re.compile(
+    "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(_INJECTION_PATTERNS)),
+    re.IGNORECASE,
+)
 
 
 def detect_prompt_injection(text: str) -> tuple[bool, Optional[str]]:
     if not text:
         return False, None
 
-    for pattern in _COMPILED_PATTERNS:
-        if pattern.search(text):
-            return True, pattern.pattern
-
-    return False, None
+    match = _COMBINED_PATTERN.search(text)
+    if match is None:
+        return False, None
+    return True, _INJECTION_PATTERNS[int(match.lastgroup[1:])]
 
 
 def sanitize_user_input(
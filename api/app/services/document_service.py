@@ -185,7 +185,8 @@ class DocumentService(BaseService):
         Returns:
             DocumentRead schema
         """
-        return DocumentRead(
+        # Trusted ORM data with a fixed schema: skip re-validation.
+        return DocumentRead.model_construct(
             id=doc.id,
             title=doc.title,
             text=doc.text,
@@ -45,12 +45,10 @@ async def run_notary_summarization_flow(
 async def run_classify_flow(
     *,
     tenant_id: str,
-    db: AsyncSession,
     payload: ClassifyRequest,
 ) -> ClassifyResponse:
     return await _run_classify_flow(
         tenant_id=tenant_id,
-        db=db,
         payload=payload,
         llm=llm_client,
     )
@@ -59,12 +57,10 @@ async def run_classify_flow(
 async def run_ask_flow(
     *,
     tenant_id: str,
-    db: AsyncSession,
     payload: AskRequest,
 ) -> AskResponse:
     return await _run_ask_flow(
         tenant_id=tenant_id,
-        db=db,
         payload=payload,
         llm=llm_client,
     )
@@ -73,12 +69,10 @@ async def run_ask_flow(
 async def run_ask_flow_stream(
     *,
     tenant_id: str,
-    db: AsyncSession,
     payload: AskRequest,
 ) -> AsyncIterator[str]:
     async for chunk in _run_ask_flow_stream(
         tenant_id=tenant_id,
-        db=db,
         payload=payload,
         llm=llm_client,
     ):
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+from dataclasses import replace
 from typing import Any, AsyncIterator, Optional
 
 import httpx
@@ -50,6 +51,8 @@ class LLMClient:
                 ),
             ),
         }
+        # Concurrent identical completions share one backend call (per tenant).
+        self._inflight: dict[tuple[str, str, Optional[str], Optional[float]], asyncio.Task] = {}
 
     def is_configured(self) -> bool:
         return bool(self._settings.llm_base_url and self._settings.llm_provider)
@@ -76,6 +79,27 @@ class LLMClient:
                 "LLM not configured. Set LLM_PROVIDER and LLM_BASE_URL (e.g. ollama + http://localhost:11434)."
             )
 
+        key = (tenant_id, prompt, system_prompt, timeout)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._complete(
+                    prompt, system_prompt=system_prompt, tenant_id=tenant_id, timeout=timeout
+                )
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller disconnecting does not cancel the call for the others.
+        return replace(await asyncio.shield(task))
+
+    async def _complete(
+        self,
+        prompt: str,
+        *,
+        system_prompt: Optional[str],
+        tenant_id: str,
+        timeout: Optional[float],
+    ) -> LLMResult:
         provider_key = self._provider_key()
         circuit_breaker = self._circuit_breakers[self._circuit_breaker_key()]
         can_execute, reason = circuit_breaker.can_execute()
@@ -28,6 +28,59 @@ async def _clean_db():
     yield
 
 
+@pytest.fixture(autouse=True)
+async def _drain_audit_buffer():
+    """Write queued audit rows before the test's event loop goes away."""
+    from app.audit import audit_buffer
+
+    yield
+    await audit_buffer.flush_and_wait()
+
+
+@pytest.fixture(autouse=True)
+def _clear_agent_caches():
+    """Reset in-process agent caches so cached answers never leak between tests."""
+    from app.agents import react_agent
+    from app.agents.tools import search
+
+    react_agent._clear_caches()
+    search._clear_ddgs_clients()
+    search._tavily_client.cache_clear()
+    search._negative_cache.clear()
+    yield
+    react_agent._clear_caches()
+
+
+@pytest.fixture(autouse=True)
+def _clear_local_document_cache():
+    """Documents are recreated with the same IDs across tests; drop the per-worker copies."""
+    from app.http.routers import documents
+
+    documents._local_clear()
+    yield
+    documents._local_clear()
+
+
+@pytest.fixture(autouse=True)
+def _clear_embedding_cache():
+    """Tests swap embedding settings freely; start each one with an empty vector cache."""
+    from app.rag.embeddings import embedding_service
+
+    embedding_service.clear_cache()
+    yield
+    embedding_service.clear_cache()
+
+
+@pytest.fixture(autouse=True)
+def _clear_rag_tenant_cache():
+    """Chunk tables are wiped between tests; drop the in-memory tenant matrices with them."""
+    from app.rag.pipeline import rag_pipeline
+
+    rag_pipeline.clear_cache()
+    yield
+    rag_pipeline.clear_cache()
+
+
 @pytest.fixture
 def tenant_id():
     return "tenant-1"
@@ -71,81 +71,117 @@ async def test_run_agent_returns_agent_failed_when_graph_throws():
 
 @pytest.mark.asyncio
 async def test_run_agent_translates_average_to_calculator():
-    """run_agent computes average directly via calculator—bypasses LLM."""
-    with patch("app.agents.react_agent.calculator_tool") as mock_calc:
-        mock_calc.invoke.return_value = "3.5"
-
+    """run_agent computes average directly—bypasses LLM and the expression evaluator."""
+    with patch("app.agents.tools.calculator._compile_expression") as mock_compile:
         result = await run_agent(
             tenant_id="t1",
             message="find the average of 1, 2, 5, 6",
             get_document_fn=AsyncMock(return_value=None),
         )
-        assert "3.5" in result["answer"]
-        assert "average" in result["answer"].lower()
+        assert result["answer"] == "The average is 3.5."
         assert "calculator_tool" in result.get("tools_used", [])
-        mock_calc.invoke.assert_called_once_with({"expression": "(1+2+5+6)/4"})
+        mock_compile.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_run_agent_average_with_spaces_and_and():
     """run_agent handles '1 2 5 and 6' format for average."""
-    with patch("app.agents.react_agent.calculator_tool") as mock_calc:
-        mock_calc.invoke.return_value = "3.5"
-
-        result = await run_agent(
-            tenant_id="t1",
-            message="find the average of 1 2 5 and 6",
-            get_document_fn=AsyncMock(return_value=None),
-        )
-        assert "3.5" in result["answer"]
-        mock_calc.invoke.assert_called_once_with({"expression": "(1+2+5+6)/4"})
+    result = await run_agent(
+        tenant_id="t1",
+        message="find the average of 1 2 5 and 6",
+        get_document_fn=AsyncMock(return_value=None),
+    )
+    assert result["answer"] == "The average is 3.5."
 
 
 @pytest.mark.asyncio
 async def test_run_agent_average_with_thousands_separators():
     """run_agent treats 1,000 and 2,000 as numbers with thousands separators."""
-    with patch("app.agents.react_agent.calculator_tool") as mock_calc:
-        mock_calc.invoke.return_value = "1500"
+    result = await run_agent(
+        tenant_id="t1",
+        message="average of 1,000 and 2,000",
+        get_document_fn=AsyncMock(return_value=None),
+    )
+    assert result["answer"] == "The average is 1500.0."
+
+
+@pytest.mark.asyncio
+async def test_run_agent_average_plain_multi_digit():
+    """run_agent treats 1000 and 2000 (no commas) as single numbers."""
+    result = await run_agent(
+        tenant_id="t1",
+        message="average of 1000 and 2000",
+        get_document_fn=AsyncMock(return_value=None),
+    )
+    assert result["answer"] == "The average is 1500.0."
+
+
+@pytest.mark.asyncio
+async def test_run_agent_math_shortcut_reports_result_limits():
+    """run_agent answers with the calculator's error text when a reduction is out of range."""
+    result = await run_agent(
+        tenant_id="t1",
+        message="product of 2 and " + "9" * 1300,
+        get_document_fn=AsyncMock(return_value=None),
+    )
+    assert result["answer"] == "Error: Unsupported operation - Result too large"
+    assert result["tools_used"] == ["calculator_tool"]
 
+
+@pytest.mark.asyncio
+async def test_run_agent_math_shortcut_skips_injection_scan():
+    """Short math questions are answered before sanitize_user_input runs."""
+    with patch("app.agents.react_agent.sanitize_user_input") as mock_sanitize:
         result = await run_agent(
             tenant_id="t1",
-            message="average of 1,000 and 2,000",
+            message="  sum of 1, 2 and 3  ",
             get_document_fn=AsyncMock(return_value=None),
         )
-        assert "1500" in result["answer"]
-        mock_calc.invoke.assert_called_once_with({"expression": "(1000+2000)/2"})
+    assert result["answer"] == "The sum is 6."
+    mock_sanitize.assert_not_called()
 
 
-@pytest.mark.asyncio
-async def test_run_agent_average_plain_multi_digit():
-    """run_agent treats 1000 and 2000 (no commas) as single numbers."""
-    with patch("app.agents.react_agent.calculator_tool") as mock_calc:
-        mock_calc.invoke.return_value = "1500"
+def test_is_pure_math_candidate():
+    from app.agents.react_agent import _is_pure_math_candidate
+
+    assert _is_pure_math_candidate("average of 1, 2, 3")
+    assert not _is_pure_math_candidate("average of the numbers")
+    assert not _is_pure_math_candidate("sum of 1 and 2 from https://example.com")
+    assert not _is_pure_math_candidate("sum of `1` and 2")
+    assert not _is_pure_math_candidate("sum of 1 and 2 " + "x" * 200)
 
+
+@pytest.mark.asyncio
+async def test_run_agent_validates_long_math_questions_before_shortcut():
+    """Messages outside the math sniff are sanitized first, then still use the shortcut."""
+    message = "sum of 1 and 2 " + "please " * 40
+    with patch(
+        "app.agents.react_agent.sanitize_user_input", side_effect=lambda text, **_: text.strip()
+    ) as mock_sanitize:
         result = await run_agent(
             tenant_id="t1",
-            message="average of 1000 and 2000",
+            message=message,
             get_document_fn=AsyncMock(return_value=None),
         )
-        assert "1500" in result["answer"]
-        mock_calc.invoke.assert_called_once_with({"expression": "(1000+2000)/2"})
+    assert result["answer"] == "The sum is 3."
+    mock_sanitize.assert_called_once()
 
 
 @pytest.mark.asyncio
 async def test_translate_math_intent_average():
-    """_translate_math_intent returns (expression, intent) for average/mean."""
+    """_translate_math_intent returns (result, intent) for average/mean."""
     from app.agents.react_agent import _translate_math_intent
 
     result = _translate_math_intent("find the average of 1, 2, 5, 6")
     assert result is not None
-    expr, intent = result
-    assert expr == "(1+2+5+6)/4"
+    value, intent = result
+    assert value == 3.5
     assert intent == "average"
 
     result = _translate_math_intent("mean of 10, 20, 30")
     assert result is not None
-    expr, intent = result
-    assert expr == "(10+20+30)/3"
+    value, intent = result
+    assert value == 20.0
     assert intent == "average"
 
 
@@ -156,8 +192,8 @@ async def test_translate_math_intent_thousands_separators():
 
     result = _translate_math_intent("average of 1,000 and 2,000")
     assert result is not None
-    expr, intent = result
-    assert expr == "(1000+2000)/2"
+    value, intent = result
+    assert value == 1500.0
     assert intent == "average"
 
 
@@ -168,8 +204,8 @@ async def test_translate_math_intent_plain_multi_digit():
 
     result = _translate_math_intent("average of 1000 and 2000")
     assert result is not None
-    expr, intent = result
-    assert expr == "(1000+2000)/2"
+    value, intent = result
+    assert value == 1500.0
     assert intent == "average"
 
 
@@ -180,6 +216,17 @@ async def test_translate_math_intent_no_match():
 
     assert _translate_math_intent("how to learn python") is None
     assert _translate_math_intent("just 5") is None  # no math keywords
+    assert _translate_math_intent("what is the average?") is None  # no numbers
+
+
+def test_translate_math_intent_keyword_variants_and_priority():
+    """Alternate keywords map to their intent; average wins over sum/product."""
+    from app.agents.react_agent import _translate_math_intent
+
+    assert _translate_math_intent("mean of 2 and 4") == (3.0, "average")
+    assert _translate_math_intent("add up 1.5 and 2.0") == (3.5, "sum")
+    assert _translate_math_intent("multiply 3 by 4") == (12, "product")
+    assert _translate_math_intent("average of the sum of 1 and 3") == (2.0, "average")
 
 
 @pytest.mark.asyncio
@@ -189,14 +236,14 @@ async def test_translate_math_intent_single_number_average():
 
     result = _translate_math_intent("average of 5")
     assert result is not None
-    expr, intent = result
-    assert expr == "(5)/1"
+    value, intent = result
+    assert value == 5.0
     assert intent == "average"
 
     result = _translate_math_intent("mean of 42")
     assert result is not None
-    expr, intent = result
-    assert expr == "(42)/1"
+    value, intent = result
+    assert value == 42.0
     assert intent == "average"
 
 
@@ -207,8 +254,8 @@ async def test_translate_math_intent_single_number_sum():
 
     result = _translate_math_intent("sum of 10")
     assert result is not None
-    expr, intent = result
-    assert expr == "10"
+    value, intent = result
+    assert value == 10
     assert intent == "sum"
 
 
@@ -219,8 +266,8 @@ async def test_translate_math_intent_single_number_product():
 
     result = _translate_math_intent("product of 7")
     assert result is not None
-    expr, intent = result
-    assert expr == "7"
+    value, intent = result
+    assert value == 7
     assert intent == "product"
 
 
@@ -388,18 +435,14 @@ async def test_run_agent_returns_polite_fallback_when_summarize_fails():
 @pytest.mark.asyncio
 async def test_run_agent_stream_math_shortcut_without_llm():
     """run_agent_stream computes average via calculator—works even without LLM (matches run_agent)."""
-    with patch("app.agents.react_agent.calculator_tool") as mock_calc:
-        mock_calc.invoke.return_value = "3.5"
-
-        tokens = []
-        async for t in run_agent_stream(
-            tenant_id="t1",
-            message="find the average of 1, 2, 5, 6",
-            get_document_fn=AsyncMock(return_value=None),
-        ):
-            tokens.append(t)
-        assert "".join(tokens) == "The average is 3.5."
-        mock_calc.invoke.assert_called_once_with({"expression": "(1+2+5+6)/4"})
+    tokens = []
+    async for t in run_agent_stream(
+        tenant_id="t1",
+        message="find the average of 1, 2, 5, 6",
+        get_document_fn=AsyncMock(return_value=None),
+    ):
+        tokens.append(t)
+    assert "".join(tokens) == "The average is 3.5."
 
 
 @pytest.mark.asyncio
@@ -510,15 +553,18 @@ async def test_run_agent_returns_final_ai_message():
         }
     )
 
+    get_document_fn = AsyncMock(return_value=None)
     with patch("app.agents.react_agent.agent_graph") as mock_agent_graph:
         mock_agent_graph.return_value = mock_graph
 
         result = await run_agent(
             tenant_id="t1",
             message="What is 6*7?",
-            get_document_fn=AsyncMock(return_value=None),
+            get_document_fn=get_document_fn,
         )
         assert result["answer"] == "The answer is 42."
+    config = mock_graph.ainvoke.call_args.args[1]
+    assert config["configurable"]["get_document_fn"] is get_document_fn
 
 
 def test_agent_graph_returns_compiled_graph_when_configured():
@@ -539,9 +585,39 @@ def test_agent_graph_returns_compiled_graph_when_configured():
             return_value=mock_model,
         ),
     ):
-        graph = agent_graph("t1", AsyncMock(return_value=None))
+        graph = agent_graph("t1")
+        assert agent_graph("t1") is graph
+        assert agent_graph("t2") is not graph
     assert graph is not None
     assert hasattr(graph, "ainvoke")
+    mock_model.bind_tools.assert_called()
+    assert mock_model.bind_tools.call_count == 2
+
+
+def test_reset_agent_graph_cache_forces_rebuild():
+    """reset_agent_graph_cache drops compiled graphs so new settings take effect."""
+    from app.agents import reset_agent_graph_cache
+
+    with patch("app.agents.react_agent.create_chat_model", return_value=MagicMock()) as create:
+        first = agent_graph("t1")
+        reset_agent_graph_cache()
+        second = agent_graph("t1")
+    assert first is not second
+    assert create.call_count == 2
+
+
+def test_agent_graph_rebuilds_when_chat_model_changes():
+    """agent_graph drops a tenant's cached graph once the configured model changes."""
+    first_model = MagicMock()
+    second_model = MagicMock()
+
+    with patch("app.agents.react_agent._get_model_without_tools", return_value=first_model):
+        first = agent_graph("t1")
+    with patch("app.agents.react_agent._get_model_without_tools", return_value=second_model):
+        second = agent_graph("t1")
+
+    assert first is not second
+    second_model.bind_tools.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -594,11 +670,11 @@ async def test_run_agent_logs_exception_when_calculator_fails_for_math_intent():
     )
 
     with (
-        patch("app.agents.react_agent.calculator_tool") as mock_calc,
+        patch("app.agents.react_agent.reduce_numbers") as mock_reduce,
         patch("app.agents.react_agent.agent_graph") as mock_agent_graph,
         patch("app.agents.react_agent.logger") as mock_logger,
     ):
-        mock_calc.invoke.side_effect = RuntimeError("Calculator service unavailable")
+        mock_reduce.side_effect = RuntimeError("Calculator service unavailable")
         mock_agent_graph.return_value = mock_graph
 
         result = await run_agent(
@@ -610,7 +686,6 @@ async def test_run_agent_logs_exception_when_calculator_fails_for_math_intent():
         call_args = mock_logger.warning.call_args
         assert call_args[0][0] == "react_agent.math_intent_failed"
         assert "Calculator service unavailable" in call_args[1]["error"]
-        assert call_args[1]["intent"] == "average"
         assert result["answer"] == "I'll help with that."
 
 
@@ -626,11 +701,11 @@ async def test_run_agent_stream_logs_exception_when_calculator_fails_for_math_in
     mock_graph.astream = mock_astream
 
     with (
-        patch("app.agents.react_agent.calculator_tool") as mock_calc,
+        patch("app.agents.react_agent.reduce_numbers") as mock_reduce,
         patch("app.agents.react_agent.agent_graph") as mock_agent_graph,
         patch("app.agents.react_agent.logger") as mock_logger,
     ):
-        mock_calc.invoke.side_effect = RuntimeError("Calculator service unavailable")
+        mock_reduce.side_effect = RuntimeError("Calculator service unavailable")
         mock_agent_graph.return_value = mock_graph
 
         tokens = []
@@ -645,5 +720,523 @@ async def test_run_agent_stream_logs_exception_when_calculator_fails_for_math_in
         call_args = mock_logger.warning.call_args
         assert call_args[0][0] == "react_agent.math_intent_failed"
         assert "Calculator service unavailable" in call_args[1]["error"]
-        assert call_args[1]["intent"] == "sum"
         assert "".join(tokens) == "Calculated result."
+
+
+@pytest.mark.asyncio
+async def test_run_agent_serves_repeated_prompt_from_response_cache():
+    """run_agent reuses a cached answer for a normalized repeat of the same prompt."""
+    mock_graph = AsyncMock()
+    mock_graph.ainvoke = AsyncMock(
+        return_value={
+            "messages": [
+                ToolMessage(content="Paris", tool_call_id="x", name="search_tool"),
+                AIMessage(content="The capital of France is Paris.", tool_calls=[]),
+            ]
+        }
+    )
+
+    with patch("app.agents.react_agent.agent_graph", return_value=mock_graph):
+        first = await run_agent(
+            tenant_id="t1",
+            message="What is the capital of France?",
+            get_document_fn=AsyncMock(return_value=None),
+        )
+        second = await run_agent(
+            tenant_id="t1",
+            message="what is   the CAPITAL of france?",
+            get_document_fn=AsyncMock(return_value=None),
+        )
+        other_tenant = await run_agent(
+            tenant_id="t2",
+            message="What is the capital of France?",
+            get_document_fn=AsyncMock(return_value=None),
+        )
+
+    assert first == second == other_tenant
+    assert second["tools_used"] == ["search_tool"]
+    assert mock_graph.ainvoke.call_count == 2
+
+
+@pytest.mark.parametrize(
+    ("first", "second"),
+    [
+        ("When was Einstein born?", "Where was Einstein born?"),
+        ("Who is the CEO of Apple?", "What is the CEO of Apple?"),
+        ("Why is the sky blue?", "How is the sky blue?"),
+    ],
+)
+def test_normalize_prompt_keeps_question_words(first, second):
+    """Questions that differ only in stop words never share a response-cache key."""
+    from app.agents.react_agent import _normalize_prompt
+
+    assert _normalize_prompt(first) != _normalize_prompt(second)
+    assert _normalize_prompt(first) == _normalize_prompt(f"  {first.upper()}  ")
+
+
+@pytest.mark.asyncio
+async def test_run_agent_does_not_cache_fallback_answers():
+    """run_agent skips the response cache when the model output needed a fallback."""
+    mock_graph = AsyncMock()
+    mock_graph.ainvoke = AsyncMock(
+        return_value={"messages": [AIMessage(content='{"name": "x", "parameters": {}}')]}
+    )
+
+    with (
+        patch("app.agents.react_agent.agent_graph", return_value=mock_graph),
+        patch(
+            "app.agents.react_agent._web_fallback_answer",
+            new_callable=AsyncMock,
+            return_value=(None, "no_results"),
+        ),
+    ):
+        for _ in range(2):
+            await run_agent(
+                tenant_id="t1",
+                message="what is regular expression",
+                get_document_fn=AsyncMock(return_value=None),
+            )
+
+    assert mock_graph.ainvoke.call_count == 2
+
+
+def test_response_cache_expires_and_evicts_least_recently_used():
+    """ResponseCache drops expired entries and evicts the LRU entry past maxsize."""
+    from app.agents.response_cache import ResponseCache
+
+    cache = ResponseCache(maxsize=2, ttl_seconds=60)
+    cache.set("t1", "a", "A", [])
+    cache.set("t1", "b", "B", [])
+    assert cache.get("t1", "a") == ("A", [])
+    cache.set("t1", "c", "C", [])
+    assert cache.get("t1", "b") is None
+    assert len(cache) == 2
+
+    expired = ResponseCache(maxsize=2, ttl_seconds=0)
+    expired.set("t1", "a", "A", [])
+    assert expired.get("t1", "a") is None
+
+    disabled = ResponseCache(maxsize=0)
+    disabled.set("t1", "a", "A", [])
+    assert disabled.get("t1", "a") is None
+    assert len(disabled) == 0
+
+
+def test_response_cache_shards_by_tenant_and_evicts_idle_tenants():
+    """ResponseCache bounds entries per tenant and drops the least recently used tenant."""
+    from app.agents.response_cache import ResponseCache
+
+    cache = ResponseCache(maxsize=1, ttl_seconds=60, max_tenants=2)
+    cache.set("t1", "a", "A1", ["search_tool"])
+    cache.set("t2", "a", "A2", [])
+    assert cache.get("t1", "a") == ("A1", ["search_tool"])
+
+    cache.set("t3", "a", "A3", [])
+    assert cache.get("t2", "a") is None
+    assert cache.get("t1", "a") == ("A1", ["search_tool"])
+    assert cache.get("t3", "a") == ("A3", [])
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_message_parsers_are_memoized():
+    """Math-intent and search-query parsing reuse results for repeated messages."""
+    from app.agents.react_agent import _search_query_from_message, _translate_math_intent
+
+    message = "what is the sum of 3, 4 and 5?"
+    assert _translate_math_intent(message) is _translate_math_intent(message)
+    hits = _search_query_from_message.cache_info().hits
+    _search_query_from_message(message)
+    _search_query_from_message(message)
+    assert _search_query_from_message.cache_info().hits == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_run_agent_skips_graph_lookup_when_llm_not_configured():
+    """run_agent answers 'not configured' without touching agent_graph."""
+    with (
+        patch("app.agents.react_agent._llm_configured", return_value=False),
+        patch("app.agents.react_agent.agent_graph") as mock_agent_graph,
+    ):
+        result = await run_agent(
+            tenant_id="t1",
+            message="Hi",
+            get_document_fn=AsyncMock(return_value=None),
+        )
+    assert result.get("error") == "llm_not_configured"
+    mock_agent_graph.assert_not_called()
+
+
+def test_extract_result_uses_last_ai_message_and_collects_tools():
+    """_extract_result returns the final AI answer and tools in first-use order."""
+    from app.agents.react_agent import NO_RESPONSE, _extract_result
+
+    answer, tools = _extract_result(
+        {
+            "messages": [
+                AIMessage(content="thinking", tool_calls=[]),
+                ToolMessage(content="1", tool_call_id="a", name="search_tool"),
+                ToolMessage(content="2", tool_call_id="b", name="calculator_tool"),
+                ToolMessage(content="3", tool_call_id="c", name="search_tool"),
+                AIMessage(content=["done"], tool_calls=[]),
+            ]
+        }
+    )
+    assert answer == "['done']"
+    assert tools == ["search_tool", "calculator_tool"]
+    assert _extract_result({"messages": []}) == (NO_RESPONSE, [])
+    assert _extract_result({"messages": [AIMessage(content="  ")]}) == (NO_RESPONSE, [])
+
+
+def test_search_query_keeps_original_casing_of_kept_words():
+    """_search_query_from_message drops stop words case-insensitively, keeps word casing."""
+    from app.agents.react_agent import _search_query_from_message
+
+    assert _search_query_from_message("Tell me about The Eiffel Tower in Paris") == (
+        "Eiffel Tower Paris"
+    )
+    assert _search_query_from_message("the a an?") == "the a an"
+
+
+@pytest.mark.asyncio
+async def test_apply_fallback_does_not_duplicate_search_tool():
+    """The web fallback records search_tool only once in tools_used."""
+    from app.agents.react_agent import _apply_fallback_if_needed
+
+    with patch(
+        "app.agents.react_agent._web_fallback_answer",
+        new_callable=AsyncMock,
+        return_value=("Summary.", "ok"),
+    ):
+        answer, tools = await _apply_fallback_if_needed("q", "", ["search_tool", "calculator_tool"])
+    assert answer == "Summary."
+    assert tools == ["search_tool", "calculator_tool"]
+
+
+def test_is_malformed_detects_tool_call_payloads():
+    """_is_malformed flags JSON tool-call payloads and ignores plain text."""
+    from app.agents.react_agent import _is_malformed
+
+    assert _is_malformed('  \n{"name": "x", "parameters": {}}')
+    assert _is_malformed('{"tool_calls": []}')
+    assert _is_malformed('{"function": "f"}')
+    assert not _is_malformed('{"answer": "plain json"}')
+    assert not _is_malformed('The "name" has "parameters".')
+    assert not _is_malformed("   ")
+    assert not _is_malformed(None)  # type: ignore[arg-type]
+
+
+def test_is_malformed_only_scans_the_head_of_the_answer():
+    """Tool-call keys deep inside a long JSON-looking answer are not treated as leaks."""
+    from app.agents.react_agent import _is_malformed
+
+    padding = '"text": "' + "x" * 300 + '", '
+    assert _is_malformed(' {"name": "x", ' + padding + '"parameters": {}}') is False
+    assert _is_malformed('{"function": "f", ' + padding + "}")
+
+
+@pytest.mark.asyncio
+async def test_web_fallback_answer_runs_search_off_the_event_loop():
+    """_web_fallback_answer runs the blocking search in a worker thread and summarizes it."""
+    import threading
+
+    from app.agents.react_agent import _web_fallback_answer
+
+    search_threads = []
+
+    def fake_search(query: str) -> str:
+        search_threads.append(threading.current_thread())
+        return f"results for {query} " + "x" * 5000
+
+    with (
+        patch("app.agents.react_agent.search_web", side_effect=fake_search),
+        patch(
+            "app.agents.react_agent._summarize_search_results",
+            new_callable=AsyncMock,
+            side_effect=[None, "Summary."],
+        ) as mock_summarize,
+    ):
+        summary, status = await _web_fallback_answer("What is the Eiffel Tower?")
+
+    assert (summary, status) == ("Summary.", "ok")
+    assert search_threads and search_threads[0] is not threading.main_thread()
+    assert mock_summarize.await_args.kwargs["strict_english"] is True
+    assert len(mock_summarize.await_args.kwargs["search_content"]) == 2000
+
+
+@pytest.mark.asyncio
+async def test_web_fallback_answer_reports_search_errors():
+    """_web_fallback_answer maps search exceptions and summarizer failures to statuses."""
+    from app.agents.react_agent import _web_fallback_answer
+    from app.agents.tools.search import SearchToolError, SearchToolNoResults
+
+    with patch("app.agents.react_agent.search_web", side_effect=SearchToolNoResults("q")):
+        assert await _web_fallback_answer("q") == (None, "no_results")
+    with patch("app.agents.react_agent.search_web", side_effect=SearchToolError("down")):
+        assert await _web_fallback_answer("q") == (None, "search_failed")
+    with (
+        patch("app.agents.react_agent.search_web", return_value="results"),
+        patch(
+            "app.agents.react_agent._summarize_search_results",
+            new_callable=AsyncMock,
+            return_value=None,
+        ),
+    ):
+        assert await _web_fallback_answer("q") == (None, "summarize_failed")
+
+
+def test_get_model_without_tools_is_resolved_once():
+    """The shared chat model is resolved from settings once until caches are cleared."""
+    from app.agents import react_agent
+
+    with patch("app.agents.react_agent.create_chat_model", return_value=MagicMock()) as create:
+        first = react_agent._get_model_without_tools()
+        assert react_agent._get_model_without_tools() is first
+        react_agent._clear_caches()
+        react_agent._get_model_without_tools()
+    assert create.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_agent_graph_prepends_system_message_to_state_messages():
+    """call_model sends the shared system message followed by the conversation."""
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    from app.agents.prompts import REACT_SYSTEM_PROMPT
+
+    seen: list[list] = []
+    model = MagicMock()
+
+    def _invoke(messages, config):
+        seen.append(messages)
+        return AIMessage(content="Hello!")
+
+    model.bind_tools.return_value.invoke.side_effect = _invoke
+
+    with patch("app.agents.react_agent._get_model_without_tools", return_value=model):
+        graph = agent_graph("t1")
+    result = await graph.ainvoke({"messages": [HumanMessage(content="Hi")]})
+
+    assert result["messages"][-1].content == "Hello!"
+    assert isinstance(seen[0][0], SystemMessage)
+    assert seen[0][0].content == REACT_SYSTEM_PROMPT
+    assert [m.content for m in seen[0][1:]] == ["Hi"]
+
+
+@pytest.mark.asyncio
+async def test_agent_graph_routes_tool_calls_to_tool_node():
+    """should_continue sends AIMessages with tool calls through the tool node."""
+    from langchain_core.messages import HumanMessage
+
+    model = MagicMock()
+    model.bind_tools.return_value.invoke.side_effect = [
+        AIMessage(
+            content="",
+            tool_calls=[{"name": "calculator_tool", "args": {"expression": "6*7"}, "id": "c1"}],
+        ),
+        AIMessage(content="The answer is 42."),
+    ]
+
+    with patch("app.agents.react_agent._get_model_without_tools", return_value=model):
+        graph = agent_graph("t1")
+    result = await graph.ainvoke({"messages": [HumanMessage(content="6*7?")]})
+
+    tool_messages = [m for m in result["messages"] if isinstance(m, ToolMessage)]
+    assert [m.content for m in tool_messages] == ["42"]
+    assert result["messages"][-1].content == "The answer is 42."
+
+
+@pytest.mark.asyncio
+async def test_run_agent_stream_skips_tool_output_and_empty_chunks():
+    """run_agent_stream yields only AI text, never tool results or empty chunks."""
+    from langchain_core.messages import AIMessageChunk
+
+    async def mock_astream(*args, stream_mode=None, **kwargs):
+        yield (AIMessageChunk(content=""), {})
+        yield (ToolMessage(content="secret tool output", tool_call_id="x"), {})
+        yield (AIMessageChunk(content="Done"), {})
+        yield (AIMessageChunk(content=[{"type": "text", "text": "!"}]), {})
+
+    mock_graph = AsyncMock()
+    mock_graph.astream = mock_astream
+
+    with patch("app.agents.react_agent.agent_graph", return_value=mock_graph):
+        tokens = [
+            t
+            async for t in run_agent_stream(
+                tenant_id="t1",
+                message="Hi",
+                get_document_fn=AsyncMock(return_value=None),
+            )
+        ]
+    text = "".join(tokens)
+    assert text.startswith("Done")
+    assert "secret" not in text
+
+
+def test_search_query_prefix_and_stop_word_edge_cases():
+    """Prefix stripping needs a full leading phrase; stop words match whole words only."""
+    from app.agents.react_agent import _search_query_from_message
+
+    assert _search_query_from_message("What is theory of relativity?") == "theory relativity"
+    assert _search_query_from_message("How is the weather in Oslo") == "weather Oslo"
+    assert _search_query_from_message("Describers unite") == "Describers unite"
+    assert _search_query_from_message("Explain   it's a best-selling book") == (
+        "it's best-selling book"
+    )
+    assert _search_query_from_message("   ") == "   "
+
+
+@pytest.mark.asyncio
+async def test_batch_tokens_coalesces_bursts_and_flushes_on_size():
+    """Back-to-back deltas are merged, with a chunk emitted once ~64 chars are buffered."""
+    from app.agents.react_agent import _batch_tokens
+
+    async def tokens():
+        for _ in range(20):
+            yield "abcd"
+
+    chunks = [c async for c in _batch_tokens(tokens())]
+    assert "".join(chunks) == "abcd" * 20
+    assert chunks == ["abcd" * 16, "abcd" * 4]
+
+
+@pytest.mark.asyncio
+async def test_batch_tokens_flushes_after_pause():
+    """A lull longer than the flush window sends what is buffered so far."""
+    import asyncio
+
+    from app.agents.react_agent import _batch_tokens
+
+    async def tokens():
+        yield "Hel"
+        yield "lo"
+        await asyncio.sleep(0.05)
+        yield " world"
+
+    assert [c async for c in _batch_tokens(tokens())] == ["Hello", " world"]
+
+
+@pytest.mark.asyncio
+async def test_run_agent_stream_flushes_buffered_tokens_before_error():
+    """Tokens produced before a stream failure still reach the client."""
+
+    async def mock_astream(*args, stream_mode=None, **kwargs):
+        yield ({"content": "Partial"}, {})
+        raise RuntimeError("boom")
+
+    mock_graph = AsyncMock()
+    mock_graph.astream = mock_astream
+
+    with patch("app.agents.react_agent.agent_graph", return_value=mock_graph):
+        tokens = [
+            t
+            async for t in run_agent_stream(
+                tenant_id="t1",
+                message="Hi",
+                get_document_fn=AsyncMock(return_value=None),
+            )
+        ]
+    assert tokens[0] == "Partial"
+    assert "try again" in tokens[1].lower()
+
+
+@pytest.mark.asyncio
+async def test_summarize_search_results_fills_prompt_template_verbatim():
+    """The summary prompt template keeps user text with braces intact."""
+    from app.agents.react_agent import _SUMMARY_SYSTEM_MESSAGE, _summarize_search_results
+
+    model = AsyncMock()
+    model.ainvoke = AsyncMock(return_value=AIMessage(content="Summary."))
+    with patch("app.agents.react_agent._get_model_without_tools", return_value=model):
+        text = await _summarize_search_results(
+            "what is {json}?", search_content="[1] Result", strict_english=False
+        )
+
+    assert text == "Summary."
+    system, prompt = model.ainvoke.call_args[0][0]
+    assert system is _SUMMARY_SYSTEM_MESSAGE
+    assert "Question: what is {json}?\n\nSearch results:\n[1] Result" in prompt.content
+
+
+def test_looks_like_search_question():
+    from app.agents.react_agent import _looks_like_search_question
+
+    assert _looks_like_search_question("Who won the 2022 World Cup")
+    assert _looks_like_search_question("Tallest building in Oslo?")
+    assert not _looks_like_search_question("Whoever said that was right")
+    assert not _looks_like_search_question("what is the average of 1 and 2?")
+    assert not _looks_like_search_question("Hello there")
+
+
+@pytest.mark.asyncio
+async def test_run_agent_speculative_search_serves_failed_graph_answer(monkeypatch):
+    """With speculative search on, the fallback runs alongside the graph and is reused."""
+    import asyncio
+
+    from app.core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "agent_speculative_search", True)
+    started = asyncio.Event()
+
+    async def fallback(message: str):
+        started.set()
+        return "Oslo is the capital of Norway.", "ok"
+
+    async def ainvoke(*args, **kwargs):
+        await asyncio.wait_for(started.wait(), 1)
+        return {"messages": [AIMessage(content="", tool_calls=[])]}
+
+    mock_graph = AsyncMock()
+    mock_graph.ainvoke = ainvoke
+    mock_fallback = AsyncMock(side_effect=fallback)
+    with (
+        patch("app.agents.react_agent.agent_graph", return_value=mock_graph),
+        patch("app.agents.react_agent._web_fallback_answer", mock_fallback),
+    ):
+        result = await run_agent(
+            tenant_id="t1",
+            message="What is the capital of Norway?",
+            get_document_fn=AsyncMock(return_value=None),
+        )
+
+    assert result == {"answer": "Oslo is the capital of Norway.", "tools_used": ["search_tool"]}
+    mock_fallback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_run_agent_cancels_speculative_search_on_clean_answer(monkeypatch):
+    """A clean graph answer cancels the in-flight speculative search."""
+    import asyncio
+
+    from app.core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "agent_speculative_search", True)
+    cancelled = asyncio.Event()
+
+    async def slow_fallback(message: str):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def ainvoke(*args, **kwargs):
+        await asyncio.sleep(0)
+        return {"messages": [AIMessage(content="Oslo.", tool_calls=[])]}
+
+    mock_graph = AsyncMock()
+    mock_graph.ainvoke = ainvoke
+    with (
+        patch("app.agents.react_agent.agent_graph", return_value=mock_graph),
+        patch("app.agents.react_agent._web_fallback_answer", side_effect=slow_fallback),
+    ):
+        result = await run_agent(
+            tenant_id="t1",
+            message="What is the capital of Norway?",
+            get_document_fn=AsyncMock(return_value=None),
+        )
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+    assert result["answer"] == "Oslo."
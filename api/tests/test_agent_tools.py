@@ -89,7 +89,7 @@ def test_search_tool_returns_results():
                 }
             ]
 
-    with patch("duckduckgo_search.DDGS", return_value=FakeDDGS()):
+    with patch("app.agents.tools.search.DDGS", return_value=FakeDDGS()):
         result = search_tool.invoke({"query": "weather Paris"})
 
     assert "Paris weather forecast" in result
@@ -109,7 +109,7 @@ def test_search_tool_uses_tavily_when_configured():
 
     with (
         patch("app.core.config.get_settings") as mock_settings,
-        patch("langchain_tavily.TavilySearch") as mock_tavily_class,
+        patch("app.agents.tools.search.TavilySearch") as mock_tavily_class,
     ):
         mock_settings.return_value.search_provider = "tavily"
         mock_settings.return_value.tavily_api_key = "tvly-test-key"
@@ -125,6 +125,105 @@ def test_search_tool_uses_tavily_when_configured():
         mock_tool.invoke.assert_called_once_with({"query": "test query"})
 
 
+def test_search_tool_reports_missing_provider_package():
+    """A provider whose package is not installed fails like any other search error."""
+    from unittest.mock import patch
+
+    with patch("app.agents.tools.search.DDGS", None):
+        result = search_tool.invoke({"query": "weather Paris"})
+
+    assert result.startswith("Search failed: duckduckgo_search is not installed")
+
+
+def test_search_tool_reuses_provider_clients():
+    """DuckDuckGo and Tavily clients are built once and shared across searches."""
+    from unittest.mock import patch
+
+    with patch("app.agents.tools.search.DDGS") as mock_ddgs_class:
+        mock_ddgs_class.return_value.text.return_value = [
+            {"title": "T", "body": "B", "href": "https://example.com"}
+        ]
+        search_tool.invoke({"query": "first"})
+        search_tool.invoke({"query": "second"})
+
+    mock_ddgs_class.assert_called_once_with(timeout=10)
+    assert mock_ddgs_class.return_value.text.call_count == 2
+
+    with (
+        patch("app.core.config.get_settings") as mock_settings,
+        patch("app.agents.tools.search.TavilySearch") as mock_tavily_class,
+    ):
+        mock_settings.return_value.search_provider = "tavily"
+        mock_settings.return_value.tavily_api_key = "tvly-test-key"
+        mock_tavily_class.return_value.invoke.return_value = {
+            "results": [{"title": "T", "content": "C", "url": "https://example.com"}]
+        }
+        search_tool.invoke({"query": "first"})
+        search_tool.invoke({"query": "second"})
+        search_tool.invoke({"query": "third", "max_results": 3})
+
+    assert mock_tavily_class.call_count == 2
+
+
+def test_ddgs_client_is_not_shared_between_threads():
+    """Each worker thread gets its own DuckDuckGo client, reused within that thread."""
+    import threading
+    from unittest.mock import patch
+
+    from app.agents.tools.search import _ddgs_client
+
+    clients = []
+    with patch("app.agents.tools.search.DDGS", side_effect=lambda **_: object()):
+        clients.append(_ddgs_client())
+        clients.append(_ddgs_client())
+        worker = threading.Thread(target=lambda: clients.append(_ddgs_client()))
+        worker.start()
+        worker.join()
+
+    assert clients[0] is clients[1]
+    assert clients[2] is not clients[0]
+
+
+def test_search_web_remembers_empty_but_not_failed_queries():
+    """Repeated empty searches are answered from the negative cache; failures are retried."""
+    from unittest.mock import patch
+
+    from app.agents.tools.search import SearchToolError, SearchToolNoResults, search_web
+
+    with patch("app.agents.tools.search.DDGS") as mock_ddgs_class:
+        mock_ddgs_class.return_value.text.return_value = []
+        for _ in range(2):
+            with pytest.raises(SearchToolNoResults):
+                search_web("nothing here")
+
+        mock_ddgs_class.return_value.text.side_effect = RuntimeError("rate limited")
+        for _ in range(2):
+            with pytest.raises(SearchToolError, match="rate limited"):
+                search_web("busy")
+        with pytest.raises(SearchToolError):
+            search_web("busy", max_results=3)
+
+    assert mock_ddgs_class.return_value.text.call_count == 4
+
+
+def test_search_web_negative_cache_expires():
+    """A remembered failure is retried once its TTL has passed."""
+    from unittest.mock import patch
+
+    from app.agents.tools.search import SearchToolNoResults, search_web
+
+    with (
+        patch("app.agents.tools.search.DDGS") as mock_ddgs_class,
+        patch("app.agents.tools.search.time.monotonic", side_effect=[0.0, 30.0, 61.0, 61.0]),
+    ):
+        mock_ddgs_class.return_value.text.return_value = []
+        for _ in range(3):
+            with pytest.raises(SearchToolNoResults):
+                search_web("nothing here")
+
+    assert mock_ddgs_class.return_value.text.call_count == 2
+
+
 @pytest.mark.asyncio
 async def test_document_lookup_tool_found():
     """Document lookup returns content when document exists."""
@@ -163,3 +262,20 @@ async def test_document_lookup_tool_error_on_fetch():
     result = await tool.ainvoke({"document_id": "doc1"})
     assert "Error" in result
     assert "Database connection failed" in result
+
+
+@pytest.mark.asyncio
+async def test_document_lookup_tool_reads_fetcher_from_run_config():
+    """Unbound document lookup uses the fetcher passed through the run config."""
+
+    async def get_doc(doc_id: str, tenant_id: str):
+        return {"title": f"{tenant_id}/{doc_id}", "text": "Body"}
+
+    tool = create_document_lookup_tool("t1")
+    result = await tool.ainvoke(
+        {"document_id": "doc1"}, config={"configurable": {"get_document_fn": get_doc}}
+    )
+    assert "t1/doc1" in result
+
+    missing = await tool.ainvoke({"document_id": "doc1"})
+    assert "unavailable" in missing
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import time
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -48,6 +49,26 @@ async def test_documents_create_and_get(client, tenant_headers):
     assert r2.json()["text"] == "Content"
 
 
+@pytest.mark.asyncio
+async def test_large_document_response_is_gzipped(client, tenant_headers):
+    text = "lorem ipsum " * 200
+    r = await client.post(
+        "/api/v1/documents",
+        headers=tenant_headers,
+        json={"id": "doc-gzip", "title": "Big", "text": text},
+    )
+    assert r.status_code == 201
+
+    headers = {**tenant_headers, "Accept-Encoding": "gzip"}
+    r2 = await client.get("/api/v1/documents/doc-gzip", headers=headers)
+    assert r2.status_code == 200
+    assert r2.headers["content-encoding"] == "gzip"
+    assert r2.json()["text"] == text
+
+    small = await client.get("/api/v1/health", headers=headers)
+    assert "content-encoding" not in small.headers
+
+
 @pytest.mark.asyncio
 async def test_documents_get_404_wrong_tenant(client, tenant_headers):
     await client.post(
@@ -465,7 +486,7 @@ async def test_documents_get_uses_cache_when_available(client, tenant_headers):
             "text": "From cache",
             "created_at": "2024-01-01T00:00:00Z",
         }
-    ).decode()
+    )
 
     with patch("app.http.routers.documents.get_cached", new_callable=AsyncMock) as mock_get:
         mock_get.return_value = cached
@@ -501,3 +522,293 @@ async def test_ask_stream_yields_error_on_ai_flow_error(client, tenant_headers):
             chunks = [line for line in body.split("\n") if line.startswith("data:")]
             assert len(chunks) >= 1
             assert "error" in chunks[0].lower() or "done" in chunks[0].lower()
+
+
+def _middleware_client(middleware_cls, **kwargs):
+    from fastapi import FastAPI
+
+    inner = FastAPI()
+
+    @inner.get("/api/v1/ping")
+    async def ping():
+        return {"ok": True}
+
+    @inner.get("/other")
+    async def other():
+        return {"ok": True}
+
+    app = middleware_cls(inner, **kwargs)
+    from httpx import ASGITransport, AsyncClient
+
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+def _hot_path_settings(**update):
+    from app.core.config import get_settings
+
+    base = {"api_key": None, "redis_url": None, "enable_prometheus": True}
+    return get_settings().model_copy(update={**base, **update})
+
+
+@pytest.mark.asyncio
+async def test_metrics_middleware_labels_by_route_template():
+    """Request metrics use the matched route template, not the raw URL."""
+    from fastapi import FastAPI
+    from httpx import ASGITransport, AsyncClient
+    from prometheus_client import REGISTRY
+
+    from app.http.middleware import HotPathMiddleware
+
+    inner = FastAPI()
+
+    @inner.get("/api/v1/items/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    def count(path: str, status: str) -> float:
+        sample = REGISTRY.get_sample_value(
+            "ai_platform_requests_total", {"method": "GET", "path": path, "status": status}
+        )
+        return sample or 0.0
+
+    template = "/api/v1/items/{item_id}"
+    before, before_missing = count(template, "200"), count("<unmatched>", "404")
+    middleware = HotPathMiddleware(inner, settings=_hot_path_settings())
+    transport = ASGITransport(app=middleware)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        assert (await ac.get("/api/v1/items/a")).status_code == 200
+        assert (await ac.get("/api/v1/items/b")).status_code == 200
+        assert (await ac.get("/nope")).status_code == 404
+
+    assert count(template, "200") == before + 2
+    assert count("<unmatched>", "404") == before_missing + 1
+    assert count("/api/v1/items/a", "200") == 0.0
+    assert set(middleware.metrics._latency) == {("GET", template), ("GET", "<unmatched>")}
+
+
+@pytest.mark.asyncio
+async def test_request_metrics_label_static_mount_by_prefix(tmp_path):
+    """Frontend assets under Mount("/") are counted as "/", not mixed into <unmatched>."""
+    from fastapi import FastAPI
+    from fastapi.staticfiles import StaticFiles
+    from httpx import ASGITransport, AsyncClient
+    from prometheus_client import REGISTRY
+
+    from app.http.middleware import HotPathMiddleware
+
+    (tmp_path / "app.js").write_text("console.log(1)")
+    inner = FastAPI()
+    inner.mount("/", StaticFiles(directory=str(tmp_path)), name="frontend")
+
+    def count(path: str) -> float:
+        sample = REGISTRY.get_sample_value(
+            "ai_platform_requests_total", {"method": "GET", "path": path, "status": "200"}
+        )
+        return sample or 0.0
+
+    before, before_unmatched = count("/"), count("<unmatched>")
+    middleware = HotPathMiddleware(inner, settings=_hot_path_settings())
+    transport = ASGITransport(app=middleware)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        assert (await ac.get("/app.js")).status_code == 200
+
+    assert count("/") == before + 1
+    assert count("<unmatched>") == before_unmatched
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_middleware_rejects_over_limit_tenant():
+    """Rate limiting applies to API routes per tenant header and returns 429 when exceeded."""
+    from app.http.middleware import HotPathMiddleware
+
+    settings = _hot_path_settings(rate_limit_per_minute=5, redis_url="redis://localhost:6379/0")
+    limiter = AsyncMock(side_effect=[True, False])
+    with patch("app.http.middleware.check_rate_limit", limiter):
+        async with _middleware_client(HotPathMiddleware, settings=settings) as ac:
+            assert (await ac.get("/other")).status_code == 200
+            ok = await ac.get("/api/v1/ping", headers={"X-Tenant-ID": "t9"})
+            limited = await ac.get("/api/v1/ping")
+
+    assert ok.status_code == 200
+    assert limited.status_code == 429
+    assert limited.json() == {"detail": "Rate limit exceeded. Try again later."}
+    assert limiter.await_args_list[0].args == ("t9",)
+    assert limiter.await_args_list[1].args == (settings.default_tenant_id,)
+    assert limiter.await_args_list[1].kwargs == {"limit": 5, "window_seconds": 60}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("update", "expect_hsts"),
+    [
+        ({}, False),
+        ({"environment": "prod", "api_key": "k"}, True),
+        ({"environment": "dev"}, False),
+    ],
+)
+async def test_security_headers_include_hsts_only_in_prod(update, expect_hsts):
+    from app.http.middleware import HotPathMiddleware
+
+    settings = _hot_path_settings(**update)
+    async with _middleware_client(HotPathMiddleware, settings=settings) as ac:
+        r = await ac.get("/other")
+    assert ("Strict-Transport-Security" in r.headers) is expect_hsts
+    assert r.headers["X-Frame-Options"] == "DENY"
+
+
+@pytest.mark.asyncio
+async def test_hot_path_middleware_authenticates_limits_and_decorates():
+    """API key, rate limit, request id and security headers are applied in one hop."""
+    from app.http.middleware import HotPathMiddleware
+
+    settings = _hot_path_settings(
+        api_key="k", redis_url="redis://localhost:6379/0", environment="prod"
+    )
+    limiter = AsyncMock(side_effect=[True, False])
+    with patch("app.http.middleware.check_rate_limit", limiter):
+        async with _middleware_client(HotPathMiddleware, settings=settings) as ac:
+            unauthorized = await ac.get("/api/v1/ping")
+            ok = await ac.get(
+                "/api/v1/ping",
+                headers={"X-API-Key": "k", "X-Tenant-ID": "t1", "X-Request-ID": "rid-1"},
+            )
+            limited = await ac.get("/api/v1/ping", headers={"X-API-Key": "k"})
+            other = await ac.get("/other")
+
+    assert unauthorized.status_code == 401
+    assert ok.status_code == 200
+    assert ok.headers["X-Request-ID"] == "rid-1"
+    assert ok.headers["Strict-Transport-Security"].startswith("max-age=")
+    assert ok.headers["X-Content-Type-Options"] == "nosniff"
+    assert limited.status_code == 429
+    assert other.status_code == 200
+    assert len(other.headers["X-Request-ID"]) == 32
+    assert [call.args for call in limiter.await_args_list] == [
+        ("t1",),
+        (settings.default_tenant_id,),
+    ]
+
+
+@pytest.mark.parametrize("environment", ["local", "dev", "prod"])
+def test_install_http_middleware_uses_same_stack_in_every_environment(environment):
+    from fastapi import FastAPI
+
+    from app.http.middleware import HotPathMiddleware, install_http_middleware
+
+    app = FastAPI()
+    install_http_middleware(app, _hot_path_settings(environment=environment, api_key="k"))
+
+    names = [m.cls.__name__ for m in app.user_middleware]
+    assert names == [HotPathMiddleware.__name__, "CORSMiddleware", "GZipExceptStreamsMiddleware"]
+
+
+@pytest.mark.asyncio
+async def test_documents_get_caches_the_exact_response_body(client, tenant_headers):
+    """A cache miss stores the same JSON payload that is returned to the client."""
+    await client.post(
+        "/api/v1/documents",
+        headers=tenant_headers,
+        json={"id": "fresh-doc", "title": "Fresh", "text": "Body"},
+    )
+    with (
+        patch("app.http.routers.documents.get_cached", new_callable=AsyncMock) as mock_get,
+        patch("app.http.routers.documents.set_cached", new_callable=AsyncMock) as mock_set,
+    ):
+        mock_get.return_value = None
+        r = await client.get("/api/v1/documents/fresh-doc", headers=tenant_headers)
+
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    assert r.json()["title"] == "Fresh"
+    key, stored = mock_set.await_args.args
+    assert key == "cache:tenant-1:document:fresh-doc"
+    assert stored == r.content
+
+
+@pytest.mark.asyncio
+async def test_documents_get_serves_hot_documents_from_local_cache(client, tenant_headers):
+    """Repeat reads within the local TTL skip Redis; expired entries go back to Redis."""
+    await client.post(
+        "/api/v1/documents",
+        headers=tenant_headers,
+        json={"id": "hot-doc", "title": "Hot", "text": "Body"},
+    )
+    with (
+        patch("app.http.routers.documents.get_cached", new_callable=AsyncMock) as mock_get,
+        patch("app.http.routers.documents.set_cached", new_callable=AsyncMock),
+    ):
+        mock_get.return_value = None
+        first = await client.get("/api/v1/documents/hot-doc", headers=tenant_headers)
+        second = await client.get("/api/v1/documents/hot-doc", headers=tenant_headers)
+        assert mock_get.await_count == 1
+
+        with patch("app.http.routers.documents._LOCAL_CACHE_TTL_SECONDS", 0.0):
+            from app.http.routers.documents import _local_clear
+
+            _local_clear()
+            await client.get("/api/v1/documents/hot-doc", headers=tenant_headers)
+            await client.get("/api/v1/documents/hot-doc", headers=tenant_headers)
+        assert mock_get.await_count == 3
+
+    assert first.content == second.content
+
+
+@pytest.mark.asyncio
+async def test_documents_create_drops_local_cache_entry(client, tenant_headers):
+    from app.http.routers.documents import _local_documents, _local_put
+
+    _local_put("cache:tenant-1:document:new-doc", b'{"stale": true}')
+    r = await client.post(
+        "/api/v1/documents",
+        headers=tenant_headers,
+        json={"id": "new-doc", "title": "New", "text": "Body"},
+    )
+    assert r.status_code == 201
+    assert "cache:tenant-1:document:new-doc" not in _local_documents
+
+
+def test_documents_local_cache_bounds_bytes_and_drops_expired(monkeypatch):
+    from app.http.routers import documents
+
+    monkeypatch.setattr(documents, "_LOCAL_CACHE_MAX_BYTES", 10)
+    monkeypatch.setattr(documents, "_LOCAL_CACHE_MAX_ENTRY_BYTES", 6)
+
+    documents._local_put("big", b"x" * 7)
+    assert "big" not in documents._local_documents
+
+    documents._local_put("a", b"aaaaa")
+    documents._local_put("b", b"bbbbb")
+    documents._local_put("a", b"aaaaa")  # replacing an entry does not count it twice
+    documents._local_put("c", b"ccccc")
+    assert list(documents._local_documents) == ["a", "c"]
+    assert documents._local_bytes == 10
+
+    later = time.monotonic() + documents._LOCAL_CACHE_TTL_SECONDS + 1
+    monkeypatch.setattr(documents.time, "monotonic", lambda: later)
+    documents._local_put("d", b"d")  # expired entries go on the next put, unread
+    assert list(documents._local_documents) == ["d"]
+    assert documents._local_bytes == 1
+
+
+@pytest.mark.asyncio
+async def test_frontend_static_files_cache_hashed_assets_only(tmp_path):
+    from fastapi import FastAPI
+    from httpx import ASGITransport, AsyncClient
+
+    from app.http.app import FrontendStaticFiles
+
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "index-abc123.js").write_text("console.log(1)")
+    (tmp_path / "index.html").write_text("<html></html>")
+    app = FastAPI()
+    app.mount("/", FrontendStaticFiles(directory=str(tmp_path), html=True))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        asset = await ac.get("/assets/index-abc123.js")
+        index = await ac.get("/")
+
+    assert asset.status_code == 200
+    assert asset.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert index.status_code == 200
+    assert index.headers["Cache-Control"] == "no-cache"
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
 
 import pytest
 from sqlalchemy import delete, insert, select
 
-from app.audit import purge_expired_audits
+from app.audit import AuditBuffer, purge_expired_audits
 from app.db import get_engine
 from app.models import AiCallAudit, Base
 
@@ -63,3 +64,139 @@ async def test_purge_deletes_old_records():
         result = await conn.execute(select(AiCallAudit.id))
         remaining = result.scalars().all()
     assert remaining == ["recent-1"]
+
+
+async def test_purge_deletes_in_batches():
+    """Expired rows are removed in PURGE_BATCH_SIZE chunks until none are left."""
+    engine = get_engine()
+    old_date = datetime.now(timezone.utc) - timedelta(days=100)
+
+    with (
+        patch("app.audit.get_settings") as mock,
+        patch("app.audit.PURGE_BATCH_SIZE", 2),
+    ):
+        mock.return_value.ai_audit_retention_days = 90
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(delete(AiCallAudit))
+            await conn.execute(
+                insert(AiCallAudit),
+                [
+                    {
+                        "id": f"old-{i}",
+                        "tenant_id": "t1",
+                        "flow_name": "ask",
+                        "request_payload": {},
+                        "response_payload": {},
+                        "success": True,
+                        "created_at": old_date,
+                    }
+                    for i in range(5)
+                ],
+            )
+
+        deleted = await purge_expired_audits()
+
+    assert deleted == 5
+    async with engine.begin() as conn:
+        result = await conn.execute(select(AiCallAudit.id))
+        assert result.scalars().all() == []
+
+
+def _audit_row(i: int) -> dict:
+    return {
+        "id": f"buffered-{i}",
+        "tenant_id": "t1",
+        "flow_name": "classify",
+        "request_payload": {"i": i},
+        "response_payload": None,
+        "success": True,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+async def test_audit_buffer_writes_full_batch_at_once():
+    buffer = AuditBuffer(max_rows=3, flush_seconds=60)
+    for i in range(3):
+        buffer.append(_audit_row(i))
+    assert len(buffer) == 0  # handed to a flush task once full
+
+    await buffer.flush_and_wait()
+    async with get_engine().begin() as conn:
+        ids = (await conn.execute(select(AiCallAudit.id))).scalars().all()
+    assert sorted(ids) == ["buffered-0", "buffered-1", "buffered-2"]
+
+
+async def test_audit_buffer_flushes_after_interval():
+    buffer = AuditBuffer(max_rows=100, flush_seconds=0.01)
+    buffer.append(_audit_row(0))
+    await asyncio.sleep(0.05)
+
+    assert len(buffer) == 0
+    async with get_engine().begin() as conn:
+        ids = (await conn.execute(select(AiCallAudit.id))).scalars().all()
+    assert ids == ["buffered-0"]
+
+
+async def test_audit_buffer_requeues_rows_when_write_fails():
+    buffer = AuditBuffer(max_rows=100, flush_seconds=60, retry_seconds=0.01)
+    assert buffer.append(_audit_row(0)) is True
+    with patch("app.audit.get_engine", side_effect=RuntimeError("db down")):
+        assert await buffer.flush() == 0
+    assert len(buffer) == 1  # back in the queue for the next flush
+
+    await buffer.flush_and_wait()
+    assert len(buffer) == 0
+    async with get_engine().begin() as conn:
+        ids = (await conn.execute(select(AiCallAudit.id))).scalars().all()
+    assert ids == ["buffered-0"]
+
+
+async def test_audit_buffer_drops_rows_after_max_attempts():
+    buffer = AuditBuffer(max_rows=100, flush_seconds=60, max_attempts=2, retry_seconds=0.01)
+    buffer.append(_audit_row(0))
+    with patch("app.audit.get_engine", side_effect=RuntimeError("db down")) as engine:
+        await buffer.flush_and_wait()
+    assert engine.call_count == 2
+    assert len(buffer) == 0
+
+
+async def test_audit_buffer_refuses_rows_when_full():
+    buffer = AuditBuffer(max_rows=100, flush_seconds=60, capacity=1)
+    assert buffer.append(_audit_row(0)) is True
+    assert buffer.append(_audit_row(1)) is False
+    assert len(buffer) == 1
+    await buffer.flush_and_wait()
+
+
+async def test_audit_buffer_backs_off_after_failed_write():
+    buffer = AuditBuffer(max_rows=1, flush_seconds=0.01, retry_seconds=0.2)
+    with patch("app.audit.get_engine", side_effect=RuntimeError("db down")):
+        buffer.append(_audit_row(0))
+        await asyncio.sleep(0.01)
+    assert len(buffer) == 1
+
+    # A full batch during the backoff waits for the retry instead of writing at once.
+    buffer.append(_audit_row(1))
+    await asyncio.sleep(0.05)
+    assert len(buffer) == 2
+
+    await asyncio.sleep(0.3)
+    assert len(buffer) == 0
+    async with get_engine().begin() as conn:
+        ids = (await conn.execute(select(AiCallAudit.id))).scalars().all()
+    assert sorted(ids) == ["buffered-0", "buffered-1"]
+
+
+async def test_audit_buffer_caps_concurrent_writes():
+    buffer = AuditBuffer(max_rows=1, flush_seconds=60, max_writes=1)
+    buffer.append(_audit_row(0))
+    buffer.append(_audit_row(1))
+    assert len(buffer._flushes) == 1
+    assert len(buffer) == 1  # waits for a free write slot
+
+    await buffer.flush_and_wait()
+    async with get_engine().begin() as conn:
+        ids = (await conn.execute(select(AiCallAudit.id))).scalars().all()
+    assert sorted(ids) == ["buffered-0", "buffered-1"]
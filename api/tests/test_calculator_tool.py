@@ -24,3 +24,61 @@ def test_calculator_tool_rejects_huge_integer_pow():
 def test_calculator_tool_rejects_non_finite_results():
     out = calculator_tool.invoke({"expression": "1e308*1e308"})
     assert "not finite" in out.lower()
+
+
+def test_calculator_tool_reuses_parsed_expressions():
+    from app.agents.tools.calculator import _compile_expression
+
+    _compile_expression.cache_clear()
+    assert calculator_tool.invoke({"expression": "(1+2)*3"}) == "9"
+    assert calculator_tool.invoke({"expression": "(1+2)*3"}) == "9"
+    info = _compile_expression.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_calculator_tool_rejects_unsupported_operators():
+    import ast
+
+    import pytest
+
+    from app.agents.tools.calculator import _validate_node
+
+    assert calculator_tool.invoke({"expression": "1 << 2"}).startswith("Error:")
+    for expr in ("~1", "1 << 2", "1 if 2 else 3"):
+        with pytest.raises(ValueError, match="Unsupported"):
+            _validate_node(ast.parse(expr, mode="eval").body)
+
+
+def test_reduce_numbers_matches_expression_results():
+    from app.agents.tools.calculator import reduce_numbers
+
+    assert reduce_numbers("sum", (1, 2, 3)) == 6
+    assert isinstance(reduce_numbers("sum", (1, 2, 3)), int)
+    assert reduce_numbers("average", (1, 2, 5, 6)) == 3.5
+    assert reduce_numbers("product", (3, 4)) == 12
+    assert reduce_numbers("sum", (0.1,) * 10) == 1.0
+
+
+def test_reduce_numbers_enforces_result_limits():
+    import pytest
+
+    from app.agents.tools.calculator import reduce_numbers
+
+    with pytest.raises(ValueError, match="too large"):
+        reduce_numbers("product", (2**3000, 2**3000))
+    with pytest.raises(ValueError, match="not finite"):
+        reduce_numbers("product", (1e308, 1e308))
+    with pytest.raises(ValueError):
+        reduce_numbers("sum", ())
+    with pytest.raises(ValueError, match="Unsupported"):
+        reduce_numbers("median", (1, 2))
+
+
+def test_calculator_tool_rejects_disallowed_characters_before_parsing():
+    from unittest.mock import patch
+
+    with patch("app.agents.tools.calculator.ast.parse") as mock_parse:
+        out = calculator_tool.invoke({"expression": "__import__('os')"})
+    assert out.startswith("Error: Invalid syntax")
+    mock_parse.assert_not_called()
+    assert calculator_tool.invoke({"expression": "1_000 * 2.5e2"}) == "250000.0"
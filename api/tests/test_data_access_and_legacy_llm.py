@@ -42,14 +42,26 @@ def test_main_and_orchestration_placeholders_importable():
     assert workflow_engine.__all__ == []
 
 
+def test_engine_json_columns_use_orjson():
+    from app.db import _json_dumps
+
+    assert _json_dumps({"a": [1.5, 2], 3: None}) == '{"a":[1.5,2],"3":null}'
+
+
 class _FakeUpload:
     def __init__(self, filename: str, body: bytes):
         self.filename = filename
         self._body = body
+        self._offset = 0
+        self.reads = 0
 
-    async def read(self) -> bytes:
+    async def read(self, size: int = -1) -> bytes:
         await asyncio.sleep(0)
-        return self._body
+        self.reads += 1
+        end = len(self._body) if size < 0 else self._offset + size
+        chunk = self._body[self._offset : end]
+        self._offset += len(chunk)
+        return chunk
 
 
 class _FakeResponse:
@@ -126,9 +138,30 @@ async def test_document_to_read_and_upload_validation_paths():
         await prepare_uploaded_document(_FakeUpload("x" * 70 + ".txt", b"ok"))
 
 
+@pytest.mark.asyncio
+async def test_upload_is_decoded_in_chunks_and_stops_early_when_too_large():
+    from app.documents.service import MAX_UPLOAD_BYTES, UPLOAD_CHUNK_BYTES
+
+    # A multi-byte character straddling a chunk boundary still decodes.
+    body = b"a" * (UPLOAD_CHUNK_BYTES - 1) + "é".encode() + b"z"
+    prepared = await prepare_uploaded_document(_FakeUpload("split.txt", body))
+    assert prepared.text == "a" * (UPLOAD_CHUNK_BYTES - 1) + "éz"
+
+    big = _FakeUpload("big.txt", b"a" * (MAX_UPLOAD_BYTES * 4))
+    with pytest.raises(UploadTooLargeError):
+        await prepare_uploaded_document(big)
+    assert big.reads == MAX_UPLOAD_BYTES // UPLOAD_CHUNK_BYTES + 1
+
+    with pytest.raises(UploadValidationError):
+        await prepare_uploaded_document(_FakeUpload("cut.txt", "é".encode()[:1]))
+
+
 def test_duplicate_message_helpers_cover_branches():
     assert _message_indicates_duplicate("duplicate key value violates unique constraint") is True
     assert _message_indicates_duplicate("NOT NULL constraint failed") is False
+    assert _message_indicates_duplicate("UNIQUE constraint failed: documents.id") is True
+    assert _message_indicates_duplicate("unique constraint on foreign key column") is False
+    assert _message_indicates_duplicate("connection reset") is False
     assert _is_duplicate_key_error(RuntimeError("duplicate entry")) is True
     assert _is_duplicate_key_error(RuntimeError("foreign key violation")) is False
 
@@ -44,6 +44,24 @@ def test_filter_init_kwargs_handles_strict_and_kwargs_classes():
     assert flexible == {"a": 1, "b": 2, "x": 3}
 
 
+def test_filter_init_kwargs_inspects_each_class_once(monkeypatch):
+    class _Strict:
+        def __init__(self, a):
+            self.a = a
+
+    calls = []
+    real_signature = chat_models.inspect.signature
+
+    def _counting_signature(obj):
+        calls.append(obj)
+        return real_signature(obj)
+
+    monkeypatch.setattr("app.agents.chat_models.inspect.signature", _counting_signature)
+    for _ in range(3):
+        assert chat_models._filter_init_kwargs(_Strict, {"a": 1, "x": 2}) == {"a": 1}
+    assert len(calls) == 1
+
+
 def test_filter_init_kwargs_signature_failure_returns_original(monkeypatch):
     class _Any:
         def __init__(self, a):
@@ -64,8 +82,22 @@ def test_create_chat_model_returns_none_when_missing_settings():
     assert chat_models.create_chat_model(s2) is None
 
 
+@pytest.fixture
+def _fresh_chat_model_caches():
+    caches = (
+        chat_models._cached_chat_model,
+        chat_models._load_chat_ollama,
+        chat_models._load_chat_openai,
+    )
+    for cached in caches:
+        cached.cache_clear()
+    yield
+    for cached in caches:
+        cached.cache_clear()
+
+
+@pytest.mark.usefixtures("_fresh_chat_model_caches")
 def test_cached_chat_model_ollama_and_openai(monkeypatch):
-    chat_models._cached_chat_model.cache_clear()
 
     class _FakeChatOllama:
         def __init__(self, **kwargs):
@@ -85,17 +117,49 @@ def test_cached_chat_model_ollama_and_openai(monkeypatch):
     ollama = chat_models._cached_chat_model("ollama", "http://host/", "m", None, 10.0, 2)
     assert isinstance(ollama, _FakeChatOllama)
     assert ollama.kwargs["base_url"] == "http://host"
+    assert "keep_alive" not in ollama.kwargs
+
+    warm = chat_models._cached_chat_model("ollama", "http://host/", "m", None, 10.0, 2, "10m")
+    assert warm.kwargs["keep_alive"] == "10m"
 
     openai = chat_models._cached_chat_model("openai", "http://host/", "m", "k", 10.0, 2)
     assert isinstance(openai, _FakeChatOpenAI)
     assert openai.kwargs["base_url"] == "http://host/v1"
     assert openai.kwargs["api_key"] == "k"
+    assert "extra_body" not in openai.kwargs  # custom base URLs may reject the field
+
+    hosted = chat_models._cached_chat_model(
+        "openai", "https://api.openai.com/v1", "m", "k", 10.0, 2
+    )
+    assert hosted.kwargs["extra_body"]["prompt_cache_key"].startswith("agenthub-")
+    assert "model_kwargs" not in hosted.kwargs
+
+    compatible = chat_models._cached_chat_model("openai_compatible", "http://h/", "m", None, 1.0, 0)
+    assert "extra_body" not in compatible.kwargs
 
     s = _settings(llm_provider="openai", llm_api_key="key")
     created = chat_models.create_chat_model(s)
     assert isinstance(created, _FakeChatOpenAI)
 
 
+def test_setup_llm_caching_installs_global_cache(tmp_path):
+    from langchain_core.caches import InMemoryCache
+    from langchain_core.globals import get_llm_cache, set_llm_cache
+
+    try:
+        chat_models.setup_llm_caching(_settings())
+        assert get_llm_cache() is None
+
+        chat_models.setup_llm_caching(_settings(llm_cache_enabled=True))
+        assert isinstance(get_llm_cache(), InMemoryCache)
+
+        db_path = str(tmp_path / "llm_cache.db")
+        chat_models.setup_llm_caching(_settings(llm_cache_enabled=True, llm_cache_path=db_path))
+        assert type(get_llm_cache()).__name__ == "SQLiteCache"
+    finally:
+        set_llm_cache(None)
+
+
 @pytest.mark.asyncio
 async def test_mock_embedding_provider_shape_and_name():
     provider = MockEmbeddingProvider(dimension=10)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from unittest.mock import AsyncMock, patch
 
+import numpy as np
 import pytest
 
 
@@ -25,6 +26,17 @@ def test_chunk_text_respects_sentence_boundaries():
     assert any(c.strip().endswith(".") for c in chunks)
 
 
+def test_chunk_text_only_splits_at_boundaries_past_the_midpoint():
+    from app.rag.chunking import chunk_text
+
+    text = "ab. " + "c" * 20 + ".\n" + "d" * 20
+    assert chunk_text(text, chunk_size=30, chunk_overlap=2) == [
+        "ab. " + "c" * 20 + ".",
+        ".\n" + "d" * 20,
+    ]
+    assert chunk_text("a.bcdefghij", chunk_size=6, chunk_overlap=0) == ["a.bcde", "fghij"]
+
+
 @pytest.mark.asyncio
 async def test_embedding_service_returns_fixed_dimension():
     from types import SimpleNamespace
@@ -57,6 +69,60 @@ async def test_embedding_service_same_text_same_vector():
         assert v1 == v2
 
 
+@pytest.mark.asyncio
+async def test_embedding_service_embed_batch_matches_single_embeds():
+    from types import SimpleNamespace
+
+    with patch("app.rag.embeddings.get_settings") as mock_settings:
+        mock_settings.return_value = SimpleNamespace(embedding_model="mock", embedding_dimension=16)
+
+        from app.rag.embeddings import embedding_service
+
+        batch = await embedding_service.embed_batch(["a", "b", "a"])
+        assert batch == [
+            await embedding_service.embed("a"),
+            await embedding_service.embed("b"),
+            await embedding_service.embed("a"),
+        ]
+        assert await embedding_service.embed_batch([]) == []
+
+
+@pytest.mark.asyncio
+async def test_embedding_service_reuses_cached_vectors_by_content_hash():
+    from types import SimpleNamespace
+
+    from app.rag.embeddings import EmbeddingService
+
+    service = EmbeddingService(cache_size=2)
+    with (
+        patch("app.rag.embeddings.get_settings") as mock_settings,
+        patch.object(service, "_mock_embed", wraps=service._mock_embed) as compute,
+    ):
+        mock_settings.return_value = SimpleNamespace(embedding_model="mock", embedding_dimension=8)
+        first = await service.embed_batch(["same", "other"])
+        again = await service.embed_batch(["same", "other"])
+        assert again == first
+        assert compute.call_count == 2
+
+        first[0][0] = 99.0
+        assert (await service.embed("same"))[0] != 99.0
+
+        await service.embed("third")
+        assert len(service._cache) == 2
+
+        mock_settings.return_value = SimpleNamespace(embedding_model="mock", embedding_dimension=4)
+        assert len(await service.embed("same")) == 4
+
+        assert all(v.dtype == np.float32 for v in service._cache.values())
+        assert {key[0] for key in service._cache} == {"mock"}
+        calls = compute.call_count
+        mock_settings.return_value = SimpleNamespace(
+            embedding_provider="openai", embedding_model="mock", embedding_dimension=4
+        )
+        await service.embed("same")
+        assert compute.call_count == calls + 1
+
+
 @pytest.mark.asyncio
 async def test_rag_query_endpoint_returns_200(client, tenant_headers):
     with patch("app.http.routers.rag.run_rag_query_flow", new_callable=AsyncMock) as mock_flow:
@@ -1,10 +1,31 @@
 from __future__ import annotations
 
+import math
 from unittest.mock import patch
 
 import pytest
 
-from app.rag.pipeline import rag_pipeline
+from app.rag.pipeline import _embedding_matrix, _normalize_rows, _top_k_rows, rag_pipeline
+
+
+def _cosine_similarity(a: list[float], b: list[float]) -> float:
+    """Pairwise reference the vectorized scorer is checked against."""
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(x * x for x in b))
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+def _top_k_by_cosine(
+    query_vec: list[float], embeddings: list[list[float]], top_k: int
+) -> list[tuple[int, float]]:
+    """`_top_k_rows` over a list of embeddings, built the way retrieve builds its matrix."""
+    unit_matrix = _normalize_rows(_embedding_matrix(embeddings, len(query_vec)))
+    return _top_k_rows(query_vec, unit_matrix, top_k)
 
 
 @pytest.mark.asyncio
@@ -109,3 +130,159 @@ async def test_pipeline_index_document_without_db(db_session):
             text="Standalone content.",
         )
         assert n >= 1
+
+
+def test_top_k_by_cosine_matches_pairwise_scores():
+    """The batched scorer ranks like the pairwise cosine and keeps only top_k rows."""
+    query = [1.0, 0.0, 1.0]
+    embeddings = [[0.0, 1.0, 0.0], [1.0, 0.0, 1.0], [1.0, 1.0, 0.0], [2.0, 0.1, 1.9]]
+
+    ranked = _top_k_by_cosine(query, embeddings, top_k=2)
+
+    assert [i for i, _ in ranked] == [1, 3]
+    for i, score in ranked:
+        assert score == pytest.approx(_cosine_similarity(query, embeddings[i]), abs=1e-6)
+    assert len(_top_k_by_cosine(query, embeddings, top_k=10)) == 4
+
+
+def test_top_k_by_cosine_scores_degenerate_rows_zero():
+    """Empty, zero and wrong-dimension rows score 0.0 instead of failing."""
+    ranked = _top_k_by_cosine([1.0, 0.0], [[], [0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0]], 4)
+    assert sorted(score for _, score in ranked) == [0.0, 0.0, 0.0, 0.0]
+    assert _top_k_by_cosine([0.0, 0.0], [[1.0, 0.0]], 1) == [(0, 0.0)]
+    assert _top_k_by_cosine([1.0], [], 3) == []
+
+
+@pytest.mark.asyncio
+async def test_chunk_embeddings_round_trip_as_float32(db_session):
+    """Embeddings are written as packed float32 and read back as NumPy arrays."""
+    import numpy as np
+    from sqlalchemy import select
+
+    from app.models import DocumentChunk, Float32Vector
+
+    await rag_pipeline.index_document(
+        tenant_id="t-f32", document_id="doc-f32", text="Vectors as bytes.", db=db_session
+    )
+    stored = (
+        await db_session.execute(
+            select(DocumentChunk.embedding).where(DocumentChunk.tenant_id == "t-f32")
+        )
+    ).scalar_one()
+
+    assert isinstance(stored, np.ndarray)
+    assert stored.dtype == np.float32
+    assert stored.shape == (384,)
+    vector_type = Float32Vector()
+    assert (
+        vector_type.process_bind_param([0.5, -1.0], None)
+        == np.array([0.5, -1.0], dtype="<f4").tobytes()
+    )
+    assert vector_type.process_bind_param(None, None) is None
+    assert vector_type.process_result_value(None, None) is None
+
+
+@pytest.mark.asyncio
+async def test_retrieve_reuses_tenant_matrix_until_chunks_change(db_session):
+    """The tenant's chunk matrix is loaded once and reloaded only after the table changes."""
+    from sqlalchemy import insert
+
+    from app.models import DocumentChunk
+
+    await rag_pipeline.index_document(
+        tenant_id="t-cache", document_id="doc-1", text="Cached chunk.", db=db_session
+    )
+    first = await rag_pipeline.retrieve(tenant_id="t-cache", query="Cached", db=db_session)
+    cached = rag_pipeline._tenants["t-cache"]
+    again = await rag_pipeline.retrieve(tenant_id="t-cache", query="Cached", db=db_session)
+    assert again == first
+    assert rag_pipeline._tenants["t-cache"] is cached
+
+    # A write from another worker bypasses index_document but still changes the version.
+    await db_session.execute(
+        insert(DocumentChunk).values(
+            tenant_id="t-cache",
+            document_id="doc-2",
+            chunk_index=0,
+            text="Written elsewhere.",
+            embedding=[1.0] * 384,
+        )
+    )
+    await db_session.commit()
+    results = await rag_pipeline.retrieve(
+        tenant_id="t-cache", query="Cached", top_k=5, db=db_session
+    )
+    assert {r["document_id"] for r in results} == {"doc-1", "doc-2"}
+    assert rag_pipeline._tenants["t-cache"] is not cached
+
+    await rag_pipeline.index_document(
+        tenant_id="t-cache", document_id="doc-1", text="Replaced.", db=db_session
+    )
+    assert "t-cache" not in rag_pipeline._tenants
+
+
+@pytest.mark.asyncio
+async def test_retrieve_returns_empty_for_unknown_documents(db_session):
+    await rag_pipeline.index_document(
+        tenant_id="t-filter", document_id="doc-1", text="Some content.", db=db_session
+    )
+    results = await rag_pipeline.retrieve(
+        tenant_id="t-filter", query="content", document_ids=["missing"], db=db_session
+    )
+    assert results == []
+    assert await rag_pipeline.retrieve(tenant_id="nobody", query="x", db=db_session) == []
+
+
+@pytest.mark.asyncio
+async def test_index_document_stamps_all_chunks_with_one_timestamp(db_session):
+    from sqlalchemy import select
+
+    from app.models import DocumentChunk
+
+    n = await rag_pipeline.index_document(
+        tenant_id="t-ts", document_id="doc-ts", text="Sentence. " * 120, db=db_session
+    )
+    stamps = (
+        (
+            await db_session.execute(
+                select(DocumentChunk.created_at).where(DocumentChunk.tenant_id == "t-ts")
+            )
+        )
+        .scalars()
+        .all()
+    )
+    assert n > 1
+    assert len(set(stamps)) == 1
+
+
+@pytest.mark.asyncio
+async def test_tenant_matrix_is_stored_unit_normalized(db_session):
+    import numpy as np
+
+    await rag_pipeline.index_document(
+        tenant_id="t-unit", document_id="doc-1", text="Unit vectors.", db=db_session
+    )
+    await rag_pipeline.retrieve(tenant_id="t-unit", query="Unit", db=db_session)
+
+    unit_matrix = rag_pipeline._tenants["t-unit"].unit_matrix
+    assert np.allclose(np.linalg.norm(unit_matrix, axis=1), 1.0, atol=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_unfiltered_retrieve_scores_the_cached_matrix_without_copying(db_session):
+    from app.rag import pipeline
+
+    for doc_id in ("doc-a", "doc-b"):
+        await rag_pipeline.index_document(
+            tenant_id="t-view", document_id=doc_id, text=f"Text of {doc_id}.", db=db_session
+        )
+    with patch.object(pipeline, "_top_k_rows", wraps=pipeline._top_k_rows) as top_k_rows:
+        await rag_pipeline.retrieve(tenant_id="t-view", query="Text", db=db_session)
+        filtered = await rag_pipeline.retrieve(
+            tenant_id="t-view", query="Text", document_ids=["doc-b"], db=db_session
+        )
+
+    unit_matrix = rag_pipeline._tenants["t-view"].unit_matrix
+    assert top_k_rows.call_args_list[0].args[1] is unit_matrix
+    assert top_k_rows.call_args_list[1].args[1].shape[0] == 1
+    assert [r["document_id"] for r in filtered] == ["doc-b"]
@@ -20,6 +20,31 @@ async def test_cache_key():
     assert cache_key("t1", "document", "doc-1") == "cache:t1:document:doc-1"
 
 
+@pytest.mark.asyncio
+async def test_get_redis_builds_tuned_pool_once():
+    """get_redis creates one client with explicit pool sizing and reuses it."""
+    import app.core.redis as redis_module
+
+    settings = MagicMock(redis_url="redis://localhost:6379/0", redis_max_connections=16)
+    with (
+        patch.object(redis_module, "_redis", None),
+        patch("app.core.redis.get_settings", return_value=settings),
+        patch("app.core.redis.Redis.from_url") as from_url,
+    ):
+        first = await redis_module.get_redis()
+        second = await redis_module.get_redis()
+
+    assert first is second is from_url.return_value
+    from_url.assert_called_once_with(
+        "redis://localhost:6379/0",
+        decode_responses=False,
+        max_connections=16,
+        health_check_interval=30,
+        socket_keepalive=True,
+        retry_on_timeout=True,
+    )
+
+
 @pytest.mark.asyncio
 async def test_ping_redis_not_configured():
     """ping_redis returns None when Redis not configured."""
@@ -66,11 +91,11 @@ async def test_get_cached_not_configured():
 async def test_get_cached_hit():
     """get_cached returns value when key exists."""
     mock_client = AsyncMock()
-    mock_client.get = AsyncMock(return_value='{"id":"d1"}')
+    mock_client.get = AsyncMock(return_value=b'{"id":"d1"}')
     with patch("app.core.redis.get_redis", new_callable=AsyncMock) as mock_get:
         mock_get.return_value = mock_client
         result = await get_cached("cache:t1:document:d1")
-        assert result == '{"id":"d1"}'
+        assert result == b'{"id":"d1"}'
 
 
 @pytest.mark.asyncio
@@ -89,7 +114,7 @@ async def test_set_cached_not_configured():
     """set_cached does nothing when Redis not configured."""
     with patch("app.core.redis.get_redis", new_callable=AsyncMock) as mock_get:
         mock_get.return_value = None
-        await set_cached("key", "value", ttl_seconds=300)
+        await set_cached("key", b"value", ttl_seconds=300)
         mock_get.assert_called_once()
 
 
@@ -100,8 +125,8 @@ async def test_set_cached_success():
     mock_client.setex = AsyncMock(return_value=True)
     with patch("app.core.redis.get_redis", new_callable=AsyncMock) as mock_get:
         mock_get.return_value = mock_client
-        await set_cached("key", "value", ttl_seconds=300)
-        mock_client.setex.assert_called_once_with("key", 300, "value")
+        await set_cached("key", b"value", ttl_seconds=300)
+        mock_client.setex.assert_called_once_with("key", 300, b"value")
 
 
 @pytest.mark.asyncio
@@ -113,49 +138,89 @@ async def test_check_rate_limit_no_redis_returns_true():
         assert result is True
 
 
+def _rate_limit_client(allowed: int) -> MagicMock:
+    mock_client = MagicMock()
+    mock_client.script_load = AsyncMock(return_value="sha1")
+    mock_client.evalsha = AsyncMock(return_value=allowed)
+    mock_client.eval = AsyncMock(return_value=allowed)
+    return mock_client
+
+
 @pytest.mark.asyncio
 async def test_check_rate_limit_under_limit():
-    """check_rate_limit returns True when under limit."""
-    mock_client = MagicMock()
-    pipe = MagicMock()
-    pipe.zremrangebyscore = MagicMock(return_value=pipe)
-    pipe.zadd = MagicMock(return_value=pipe)
-    pipe.zcard = MagicMock(return_value=pipe)
-    pipe.expire = MagicMock(return_value=pipe)
-    mock_client.pipeline.return_value = pipe
-    mock_client.zrem = AsyncMock()
-    pipe.execute = AsyncMock(return_value=[None, None, 3])  # count=3
-    with patch("app.core.redis.get_redis", new_callable=AsyncMock) as mock_get:
+    """check_rate_limit returns True when the script admits the request."""
+    mock_client = _rate_limit_client(1)
+    with (
+        patch("app.core.redis.get_redis", new_callable=AsyncMock) as mock_get,
+        patch("app.core.redis._rate_limit_sha", None),
+    ):
         mock_get.return_value = mock_client
         result = await check_rate_limit("t1", limit=10, window_seconds=60)
         assert result is True
+        sha, numkeys, key, now, window_start, member, limit, ttl = (
+            mock_client.evalsha.await_args.args
+        )
+        assert (sha, numkeys, key, limit, ttl) == ("sha1", 1, "rl:t1", 10, 61)
+        assert window_start == now - 60
+        assert member.startswith(f"{now}:")
 
 
 @pytest.mark.asyncio
 async def test_check_rate_limit_over_limit():
-    """check_rate_limit returns False when over limit."""
-    mock_client = MagicMock()
-    pipe = MagicMock()
-    pipe.zremrangebyscore = MagicMock(return_value=pipe)
-    pipe.zadd = MagicMock(return_value=pipe)
-    pipe.zcard = MagicMock(return_value=pipe)
-    pipe.expire = MagicMock(return_value=pipe)
-    mock_client.pipeline.return_value = pipe
-    mock_client.zrem = AsyncMock()
-    # count=15 > limit 10 -> returns False
-    pipe.execute = AsyncMock(return_value=[None, None, 15])
-    with patch("app.core.redis.get_redis", new_callable=AsyncMock) as mock_get:
+    """check_rate_limit returns False when the script rejects the request."""
+    mock_client = _rate_limit_client(0)
+    with (
+        patch("app.core.redis.get_redis", new_callable=AsyncMock) as mock_get,
+        patch("app.core.redis._rate_limit_sha", None),
+    ):
         mock_get.return_value = mock_client
         result = await check_rate_limit("t1", limit=10, window_seconds=60)
         assert result is False
 
 
+@pytest.mark.asyncio
+async def test_check_rate_limit_loads_script_once():
+    """The Lua script is loaded on first use and then called by SHA."""
+    mock_client = _rate_limit_client(1)
+    with (
+        patch("app.core.redis.get_redis", new_callable=AsyncMock) as mock_get,
+        patch("app.core.redis._rate_limit_sha", None),
+    ):
+        mock_get.return_value = mock_client
+        await check_rate_limit("t1", limit=10)
+        await check_rate_limit("t1", limit=10)
+    mock_client.script_load.assert_awaited_once()
+    assert mock_client.evalsha.await_count == 2
+    first, second = (call.args[5] for call in mock_client.evalsha.await_args_list)
+    assert first != second
+    assert first.split(":")[1] == second.split(":")[1]
+
+
+@pytest.mark.asyncio
+async def test_check_rate_limit_falls_back_to_eval_on_noscript():
+    """A server that lost its script cache is answered with EVAL."""
+    from redis.exceptions import NoScriptError
+
+    mock_client = _rate_limit_client(0)
+    mock_client.evalsha.side_effect = NoScriptError("NOSCRIPT")
+    with (
+        patch("app.core.redis.get_redis", new_callable=AsyncMock) as mock_get,
+        patch("app.core.redis._rate_limit_sha", "stale"),
+    ):
+        mock_get.return_value = mock_client
+        assert await check_rate_limit("t1", limit=10) is False
+    mock_client.eval.assert_awaited_once()
+
+
 @pytest.mark.asyncio
 async def test_check_rate_limit_exception_returns_true():
     """check_rate_limit returns True on exception (fail open)."""
-    mock_client = MagicMock()
-    mock_client.pipeline.side_effect = ConnectionError("Redis down")
-    with patch("app.core.redis.get_redis", new_callable=AsyncMock) as mock_get:
+    mock_client = _rate_limit_client(0)
+    mock_client.evalsha.side_effect = ConnectionError("Redis down")
+    with (
+        patch("app.core.redis.get_redis", new_callable=AsyncMock) as mock_get,
+        patch("app.core.redis._rate_limit_sha", "sha1"),
+    ):
         mock_get.return_value = mock_client
         result = await check_rate_limit("t1", limit=10, window_seconds=60)
         assert result is True
@@ -168,3 +233,13 @@ async def test_close_redis():
     with patch("app.core.redis._redis", mock_client):
         await close_redis()
         mock_client.aclose.assert_called_once()
+
+
+def test_rate_limit_member_prefix_is_redrawn_after_fork():
+    """Forked workers must not share sorted-set members with their parent."""
+    import app.core.redis as redis_module
+
+    with patch.object(redis_module, "_rl_prefix", "parent"):
+        redis_module._reset_rate_limit_member_prefix()
+        assert redis_module._rl_prefix != "parent"
+        assert len(redis_module._rl_prefix) == 16
@@ -115,7 +115,6 @@ async def test_classify_label_matching(db_session):
         )
         out = await run_classify_flow(
             tenant_id="t1",
-            db=db_session,
             payload=ClassifyRequest(
                 text="Invoice for 100 EUR.", candidate_labels=["contract", "invoice", "letter"]
             ),
@@ -125,6 +124,21 @@ async def test_classify_label_matching(db_session):
         assert out.confidence == 0.9
 
 
+@pytest.mark.asyncio
+async def test_classify_matches_first_word_case_insensitively(db_session):
+    with patch("app.services_ai_flows.llm_client") as mock_llm:
+        mock_llm.complete = AsyncMock(
+            return_value=LLMResult(raw_text="Letter\nbecause it is", model="mock", latency_ms=1.0),
+        )
+        out = await run_classify_flow(
+            tenant_id="t1",
+            payload=ClassifyRequest(
+                text="Dear Sir.", candidate_labels=["invoice", "LETTER", "letter"]
+            ),
+        )
+        assert out.label == "LETTER"
+
+
 @pytest.mark.asyncio
 async def test_classify_label_not_in_candidates_uses_first(db_session):
     with patch("app.services_ai_flows.llm_client") as mock_llm:
@@ -133,7 +147,6 @@ async def test_classify_label_not_in_candidates_uses_first(db_session):
         )
         out = await run_classify_flow(
             tenant_id="t1",
-            db=db_session,
             payload=ClassifyRequest(text="Something.", candidate_labels=["contract", "invoice"]),
         )
         assert out.label == "contract"
@@ -146,7 +159,6 @@ async def test_classify_fallback_on_exception(db_session):
         mock_llm.complete = AsyncMock(side_effect=RuntimeError("Model down"))
         out = await run_classify_flow(
             tenant_id="t1",
-            db=db_session,
             payload=ClassifyRequest(text="X", candidate_labels=["a", "b", "c"]),
         )
         assert out.source == "fallback"
@@ -162,7 +174,6 @@ async def test_ask_success(db_session):
         )
         out = await run_ask_flow(
             tenant_id="t1",
-            db=db_session,
             payload=AskRequest(question="What is the total?", context="Total: 50 EUR."),
         )
         assert out.answer == "The total is 50 EUR."
@@ -175,7 +186,6 @@ async def test_ask_fallback_on_exception(db_session):
         mock_llm.complete = AsyncMock(side_effect=LLMError("Timeout"))
         out = await run_ask_flow(
             tenant_id="t1",
-            db=db_session,
             payload=AskRequest(question="Q?", context="C"),
         )
         assert out.source == "fallback"
@@ -196,7 +206,6 @@ async def test_ask_stream_success(db_session):
         tokens = []
         async for t in run_ask_flow_stream(
             tenant_id="t1",
-            db=db_session,
             payload=AskRequest(question="Q?", context="C"),
         ):
             tokens.append(t)
@@ -217,7 +226,6 @@ async def test_ask_stream_fallback_on_exception(db_session):
         tokens = []
         async for t in run_ask_flow_stream(
             tenant_id="t1",
-            db=db_session,
             payload=AskRequest(question="Q?", context="C"),
         ):
             tokens.append(t)
@@ -245,7 +253,6 @@ async def test_classify_raises_when_candidate_labels_empty(db_session):
     with pytest.raises(AiFlowError, match="candidate_labels cannot be empty"):
         await run_classify_flow(
             tenant_id="t1",
-            db=db_session,
             payload=ClassifyRequest(text="X", candidate_labels=[]),
         )
 
@@ -258,7 +265,6 @@ async def test_ask_flow_raises_when_llm_not_configured(db_session):
         with pytest.raises(AiFlowError, match="LLM not configured"):
             await run_ask_flow(
                 tenant_id="t1",
-                db=db_session,
                 payload=AskRequest(question="Q?", context="C"),
             )
 
@@ -271,43 +277,91 @@ async def test_ask_stream_raises_when_llm_not_configured(db_session):
         with pytest.raises(AiFlowError, match="LLM not configured"):
             async for _ in run_ask_flow_stream(
                 tenant_id="t1",
-                db=db_session,
                 payload=AskRequest(question="Q?", context="C"),
             ):
                 pass
 
 
 @pytest.mark.asyncio
-async def test_classify_audit_commit_failure_sets_metadata(db_session):
-    """When db.commit fails after audit add, metadata reflects audit_persisted=False."""
+async def test_classify_audit_is_buffered_off_the_request_session(db_session):
+    """The audit row is queued, not committed on the caller's session."""
+    from app.audit import audit_buffer
+
     with (
         patch("app.services_ai_flows.llm_client") as mock_llm,
-        patch.object(db_session, "commit", new_callable=AsyncMock, side_effect=RuntimeError("DB")),
+        patch.object(db_session, "commit", new_callable=AsyncMock) as commit,
     ):
         mock_llm.complete = AsyncMock(
             return_value=LLMResult(raw_text="invoice", model="mock", latency_ms=1.0),
         )
         out = await run_classify_flow(
             tenant_id="t1",
-            db=db_session,
             payload=ClassifyRequest(text="X", candidate_labels=["invoice", "letter"]),
         )
-        assert out.metadata.get("audit_persisted") is False
+    assert out.metadata.get("audit_persisted") is True
+    commit.assert_not_awaited()
+    assert len(audit_buffer) == 1
 
 
 @pytest.mark.asyncio
-async def test_ask_audit_commit_failure_sets_metadata(db_session):
-    """When db.commit fails after audit add in ask flow, metadata reflects audit_persisted=False."""
+async def test_classify_audit_refused_sets_metadata(db_session):
+    """When the audit buffer is full, metadata reflects audit_persisted=False."""
+    from app.audit import audit_buffer
+
     with (
         patch("app.services_ai_flows.llm_client") as mock_llm,
-        patch.object(db_session, "commit", new_callable=AsyncMock, side_effect=RuntimeError("DB")),
+        patch.object(audit_buffer, "capacity", 0),
+    ):
+        mock_llm.complete = AsyncMock(
+            return_value=LLMResult(raw_text="invoice", model="mock", latency_ms=1.0),
+        )
+        out = await run_classify_flow(
+            tenant_id="t1",
+            payload=ClassifyRequest(text="X", candidate_labels=["invoice", "letter"]),
+        )
+    assert out.label == "invoice"
+    assert out.metadata.get("audit_persisted") is False
+    assert len(audit_buffer) == 0
+
+
+@pytest.mark.asyncio
+async def test_ask_audit_refused_sets_metadata(db_session):
+    """When the audit buffer is full in ask flow, metadata reflects audit_persisted=False."""
+    from app.audit import audit_buffer
+
+    with (
+        patch("app.services_ai_flows.llm_client") as mock_llm,
+        patch.object(audit_buffer, "capacity", 0),
     ):
         mock_llm.complete = AsyncMock(
             return_value=LLMResult(raw_text="Answer.", model="mock", latency_ms=1.0),
         )
         out = await run_ask_flow(
             tenant_id="t1",
-            db=db_session,
             payload=AskRequest(question="Q?", context="C"),
         )
-        assert out.metadata.get("audit_persisted") is False
+    assert out.answer == "Answer."
+    assert out.metadata.get("audit_persisted") is False
+
+
+@pytest.mark.asyncio
+async def test_ask_audit_row_is_written_on_flush(db_session):
+    from sqlalchemy import select
+
+    from app.audit import audit_buffer
+    from app.models import AiCallAudit
+
+    with patch("app.services_ai_flows.llm_client") as mock_llm:
+        mock_llm.complete = AsyncMock(
+            return_value=LLMResult(raw_text="Answer.", model="mock", latency_ms=1.0),
+        )
+        out = await run_ask_flow(
+            tenant_id="t1",
+            payload=AskRequest(question="Q?", context="C"),
+        )
+    assert out.metadata.get("audit_persisted") is True
+    await audit_buffer.flush_and_wait()
+
+    rows = (await db_session.execute(select(AiCallAudit))).scalars().all()
+    assert [(r.tenant_id, r.flow_name, r.success) for r in rows] == [("t1", "ask", True)]
+    assert rows[0].response_payload["answer"] == out.answer
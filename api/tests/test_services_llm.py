@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from app.services_llm import LLMClient, LLMNotConfiguredError
+from app.services_llm import LLMClient, LLMNotConfiguredError, LLMResult
 
 
 def _mock_response(status_code=200, json_body=None):
@@ -82,6 +83,38 @@ async def test_complete_ollama_with_system_prompt():
             assert call_kw["json"].get("system") == "You are helpful."
 
 
+@pytest.mark.asyncio
+async def test_complete_coalesces_identical_concurrent_calls_per_tenant():
+    with patch("app.services_llm.get_settings") as m:
+        m.return_value.llm_base_url = "http://localhost:11434"
+        m.return_value.llm_provider = "ollama"
+        m.return_value.llm_timeout_seconds = 30
+        client = LLMClient()
+        release = asyncio.Event()
+
+        async def slow_complete(prompt, **_):
+            await release.wait()
+            return LLMResult(raw_text=f"re: {prompt}", model="m", latency_ms=1.0)
+
+        backend = AsyncMock(side_effect=slow_complete)
+        client._providers["ollama"].complete = backend
+        calls = [
+            asyncio.ensure_future(client.complete("same", tenant_id="t1")),
+            asyncio.ensure_future(client.complete("same", tenant_id="t1")),
+            asyncio.ensure_future(client.complete("same", tenant_id="t2")),
+            asyncio.ensure_future(client.complete("other", tenant_id="t1")),
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        first, second, other_tenant, other_prompt = await asyncio.gather(*calls)
+
+    assert backend.await_count == 3
+    assert first == second and first is not second
+    assert other_tenant.raw_text == "re: same"
+    assert other_prompt.raw_text == "re: other"
+    assert client._inflight == {}
+
+
 @pytest.mark.asyncio
 async def test_complete_ollama_non_200_raises():
     with patch("app.services_llm.get_settings") as m:
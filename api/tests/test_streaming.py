@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from unittest.mock import patch
 
 import pytest
@@ -93,3 +94,73 @@ async def test_ask_stream_respects_tenant(client, tenant_headers):
             assert r.status_code == 200
         mock_stream.assert_called_once()
         assert mock_stream.call_args.kwargs["tenant_id"] == "tenant-1"
+
+
+@pytest.mark.asyncio
+async def test_stream_text_tokens_frames_match_sse_event():
+    from app.http.sse import sse_event, stream_text_tokens
+
+    tokens = ["Hi", ' "quoted"\n', "café ✓"]
+
+    async def source():
+        for token in tokens:
+            yield token
+
+    frames = [frame async for frame in stream_text_tokens(source())]
+    assert frames == [sse_event({"token": t}) for t in tokens] + [sse_event({"done": True})]
+    assert frames[0] == b'data: {"token":"Hi"}\n\n'
+
+
+@pytest.mark.asyncio
+async def test_ask_stream_flushes_tokens_through_full_middleware_stack(app):
+    """SSE chunks reach the client one by one even when the client accepts gzip."""
+    first_chunk_sent = asyncio.Event()
+
+    async def fake_stream(*args, **kwargs):
+        yield "x" * 2000  # above the gzip minimum size
+        await asyncio.wait_for(first_chunk_sent.wait(), timeout=2)
+        yield "end"
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+        if message["type"] == "http.response.body" and message.get("body"):
+            first_chunk_sent.set()
+
+    request = {"type": "http.request", "body": b'{"question": "Q", "context": "C"}'}
+    pending = [request]
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        await asyncio.Event().wait()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/v1/ai/ask/stream",
+        "raw_path": b"/api/v1/ai/ask/stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"accept-encoding", b"gzip"),
+            (b"x-tenant-id", b"tenant-1"),
+        ],
+        "client": ("testclient", 1),
+        "server": ("test", 80),
+    }
+    with patch("app.http.routers.workflows.run_ask_flow_stream") as mock_stream:
+        mock_stream.return_value = fake_stream()
+        await asyncio.wait_for(app(scope, receive, send), timeout=5)
+
+    start = messages[0]
+    assert start["status"] == 200
+    assert b"content-encoding" not in dict(start["headers"])
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    assert b'"token":"end"' in body
+    assert b"error" not in body